@@ -3,13 +3,48 @@
 Analyze unmatched email senders using Claude to identify potential property management vendors.
 """
 
+import asyncio
+import bisect
+import hashlib
 import json
 import os
+import re
+import sqlite3
 import sys
+import time
 from pathlib import Path
 
 import anthropic
+import httpx
 import psycopg2
+from psycopg2.extras import execute_values
+
+# Senders per Claude request - smaller prompts cut latency and keep a single
+# malformed response from losing the whole classification batch
+SENDER_CHUNK_SIZE = 20
+
+# Local cache of Claude sender classifications so repeat runs only pay for
+# senders that have not been seen before (negatives are cached as null)
+CACHE_PATH = Path(__file__).parent / ".vendor-cache.sqlite"
+
+
+def open_classification_cache():
+    """Open (and if needed create) the sender classification cache."""
+    db = sqlite3.connect(CACHE_PATH)
+    db.execute("CREATE TABLE IF NOT EXISTS classifications (key TEXT PRIMARY KEY, json TEXT, ts INT)")
+    return db
+
+
+def _cache_key(sender):
+    raw = f"{sender['email'].lower()}|{(sender.get('name') or '').lower()}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+# Common A/V, smart home, and automation terms, compiled into one alternation
+# so each sender is checked with a single scan instead of one per keyword.
+_AV_KEYWORDS = ["smart", "audio", "video", "av ", "a/v", "automation", "control4",
+                "crestron", "savant", "sonos", "lutron", "nest", "ring", "adt",
+                "vivint", "haven", "cinema", "theater", "speaker", "sound"]
+_AV_RX = re.compile("|".join(re.escape(k) for k in sorted(_AV_KEYWORDS, key=len, reverse=True)))
 
 # Load environment variables from .env.local
 env_path = Path(__file__).parent.parent / ".env.local"
@@ -29,36 +64,45 @@ if not ANTHROPIC_API_KEY:
 
 
 def load_email_analysis():
-    """Load the email analysis JSON file."""
+    """Load the email analysis JSON file, keeping only the fields we use."""
     analysis_path = Path(__file__).parent.parent / "email-analysis-2025.json"
     with open(analysis_path) as f:
-        return json.load(f)
+        data = json.load(f)
+
+    # Drop the heavyweight sections (per-email patterns etc.) immediately so
+    # only the sender lists and scalar totals stay resident
+    return {
+        "analyzedAt": data.get("analyzedAt"),
+        "totalEmails": data.get("totalEmails"),
+        "uniqueSenders": data.get("uniqueSenders"),
+        "matchedVendors": data.get("matchedVendors", []),
+        "unmatchedSenders": data.get("unmatchedSenders", []),
+        "topSenders": data.get("topSenders", []),
+    }
 
 
-def get_existing_vendors():
-    """Get existing vendors from the database."""
+def get_existing_vendor_emails():
+    """Get the lowercased emails of existing vendors from the database."""
     conn = psycopg2.connect(DATABASE_URL)
-    cur = conn.cursor()
-    cur.execute("SELECT id, name, email, specialty FROM vendors")
-    vendors = cur.fetchall()
-    cur.close()
-    conn.close()
-    return vendors
+    try:
+        # Named cursor streams rows server-side instead of buffering them all
+        with conn.cursor(name="vendor_emails") as cur:
+            cur.itersize = 1000
+            cur.execute("SELECT LOWER(email) FROM vendors WHERE email IS NOT NULL")
+            return {row[0] for row in cur}
+    finally:
+        conn.close()
 
 
-def analyze_senders_with_claude(senders, client):
-    """
-    Use Claude Haiku to categorize senders as property-related or not.
-    Process in batches to be efficient.
-    """
-    # Build a list of sender info for Claude to analyze
+def build_sender_prompt(senders):
+    """Build the classification prompt for one chunk of senders."""
     sender_list = []
-    for s in senders[:100]:  # Top 100 unmatched senders
+    for s in senders:
         sender_list.append(f"- {s['email']} | {s.get('name', 'Unknown')} | {s['count']} emails")
 
     sender_text = "\n".join(sender_list)
 
-    prompt = f"""Analyze this list of email senders for a property management system.
+    return f"""Analyze this list of email senders for a property management system.
 The user (Anne) owns 10 properties in Vermont, Brooklyn NY, Rhode Island, Martinique, Paris, and San Jose CA.
 She also has 7 vehicles.
 
@@ -105,14 +149,14 @@ Respond with a JSON array of objects with this structure:
 Only include senders you're confident are property-related. Be conservative - if unsure, exclude them.
 Return ONLY the JSON array, no other text."""
 
-    response = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=4096,
-        messages=[{"role": "user", "content": prompt}]
-    )
 
-    # Parse the response
-    response_text = response.content[0].text.strip()
+def parse_vendor_response(response_text):
+    """Parse one Claude response into a list of vendor dicts.
+
+    Returns None if the response is malformed (e.g. truncated JSON) so
+    the caller can tell a failed chunk apart from 'no vendors found'.
+    """
+    response_text = response_text.strip()
     # Remove any markdown code blocks if present
     if response_text.startswith("```"):
         response_text = response_text.split("```")[1]
@@ -124,7 +168,72 @@ Return ONLY the JSON array, no other text."""
     except json.JSONDecodeError as e:
         print(f"Error parsing Claude response: {e}")
         print(f"Response was: {response_text[:500]}")
-        return []
+        return None
+
+
+async def analyze_senders_with_claude(senders, client, cache=None):
+    """
+    Use Claude Haiku to categorize senders as property-related or not.
+    Senders are split into chunks and the chunks are classified concurrently.
+    Previously classified senders are answered from the local cache.
+    """
+    senders = senders[:100]  # Top 100 unmatched senders
+
+    # Partition into cache hits and senders Claude still needs to see
+    cached_vendors = []
+    misses = []
+    if cache is not None:
+        for s in senders:
+            row = cache.execute("SELECT json FROM classifications WHERE key = ?", (_cache_key(s),)).fetchone()
+            if row:
+                classification = json.loads(row[0])
+                if classification is not None:  # null = previously judged not property-related
+                    cached_vendors.append(classification)
+            else:
+                misses.append(s)
+        if cached_vendors or len(misses) < len(senders):
+            print(f"  Cache: {len(senders) - len(misses)} hits, {len(misses)} senders to classify")
+    else:
+        misses = senders
+
+    chunks = [misses[i:i + SENDER_CHUNK_SIZE] for i in range(0, len(misses), SENDER_CHUNK_SIZE)]
+    if not chunks:
+        return cached_vendors
+
+    responses = await asyncio.gather(*[
+        client.messages.create(
+            model="claude-haiku-4-5-20251001",
+            max_tokens=1024,
+            temperature=0.0,
+            messages=[{"role": "user", "content": build_sender_prompt(chunk)}]
+        )
+        for chunk in chunks
+    ])
+
+    vendors = []
+    classified = []  # senders whose chunk parsed cleanly
+    for chunk, response in zip(chunks, responses):
+        parsed = parse_vendor_response(response.content[0].text)
+        if parsed is None:
+            # Leave the whole chunk uncached: a transient truncation must
+            # be retried next run, not frozen into permanent negatives
+            continue
+        vendors.extend(parsed)
+        classified.extend(chunk)
+
+    # Record every cleanly analyzed sender, including negatives, so
+    # reruns skip them
+    if cache is not None:
+        by_email = {v.get("email", "").lower(): v for v in vendors}
+        now = int(time.time())
+        for s in classified:
+            cache.execute(
+                "INSERT OR REPLACE INTO classifications (key, json, ts) VALUES (?, ?, ?)",
+                (_cache_key(s), json.dumps(by_email.get(s["email"].lower())), now)
+            )
+        cache.commit()
+
+    return cached_vendors + vendors
 
 
 def search_for_smarthaven(analysis_data, client):
@@ -136,20 +245,19 @@ def search_for_smarthaven(analysis_data, client):
 
     all_senders = analysis_data.get("topSenders", []) + analysis_data.get("unmatchedSenders", [])
 
-    # Search for common A/V, smart home, and automation terms
-    av_keywords = ["smart", "audio", "video", "av ", "a/v", "automation", "control4",
-                   "crestron", "savant", "sonos", "lutron", "nest", "ring", "adt",
-                   "vivint", "haven", "cinema", "theater", "speaker", "sound"]
+    # Flatten every sender into one contiguous buffer and scan it once; match
+    # positions are mapped back to senders via the start offsets. Control-char
+    # separators keep keywords from matching across field/sender boundaries.
+    blobs = [f"{sender.get('email', '').lower()}\x00{(sender.get('name') or '').lower()}"
+             for sender in all_senders]
+    starts = [0]
+    for blob in blobs:
+        starts.append(starts[-1] + len(blob) + 1)
 
-    potential_av = []
-    for sender in all_senders:
-        email = sender.get("email", "").lower()
-        name = (sender.get("name") or "").lower()
-
-        for keyword in av_keywords:
-            if keyword in email or keyword in name:
-                potential_av.append(sender)
-                break
+    buffer = "\x01".join(blobs)
+    hit_indexes = sorted({bisect.bisect_right(starts, m.start()) - 1
+                          for m in _AV_RX.finditer(buffer)})
+    potential_av = [all_senders[i] for i in hit_indexes]
 
     if potential_av:
         print(f"  Found {len(potential_av)} potential A/V-related senders:")
@@ -221,35 +329,42 @@ def add_vendors_to_database(vendors_to_add, dry_run=True):
     conn = psycopg2.connect(DATABASE_URL)
     cur = conn.cursor()
 
-    added = 0
-    for v in vendors:
-        try:
-            mapped_specialty = map_specialty_to_enum(v['specialty'])
-            cur.execute("""
-                INSERT INTO vendors (name, email, specialty, notes, is_active)
-                VALUES (%s, %s, %s, %s, TRUE)
-                ON CONFLICT DO NOTHING
-                RETURNING id
-            """, (
-                v["name"],
-                v["email"],
-                mapped_specialty,
-                f"Auto-discovered from email analysis. {v['reason']}"
-            ))
-            if cur.fetchone():
-                added += 1
-                print(f"  ✅ Added: {v['name']} ({mapped_specialty})")
-            else:
-                print(f"  ⏭️  Skipped (already exists): {v['name']}")
-            conn.commit()  # Commit after each insert to avoid transaction issues
-        except Exception as e:
-            conn.rollback()
-            print(f"  ❌ Error adding {v['name']}: {e}")
+    # One batched insert + one commit instead of a round-trip and WAL flush
+    # per vendor; ON CONFLICT DO NOTHING ... RETURNING still flags duplicates
+    rows = [
+        (
+            v["name"],
+            v["email"],
+            map_specialty_to_enum(v["specialty"]),
+            f"Auto-discovered from email analysis. {v['reason']}"
+        )
+        for v in vendors
+    ]
+
+    added_names = set()
+    try:
+        inserted = execute_values(cur, """
+            INSERT INTO vendors (name, email, specialty, notes, is_active)
+            VALUES %s
+            ON CONFLICT DO NOTHING
+            RETURNING name
+        """, rows, template="(%s, %s, %s, %s, TRUE)", fetch=True)
+        conn.commit()
+        added_names = {r[0] for r in inserted}
+    except Exception as e:
+        conn.rollback()
+        print(f"  ❌ Batch insert failed: {e}")
+
+    for (name, _, mapped_specialty, _) in rows:
+        if name in added_names:
+            print(f"  ✅ Added: {name} ({mapped_specialty})")
+        else:
+            print(f"  ⏭️  Skipped (already exists): {name}")
 
     cur.close()
     conn.close()
 
-    print(f"\n✅ Added {added} new vendors to database.")
+    print(f"\n✅ Added {len(added_names)} new vendors to database.")
 
 
 def main():
@@ -266,14 +381,22 @@ def main():
     print(f"  Already matched vendors: {len(analysis.get('matchedVendors', []))}")
     print(f"  Unmatched senders: {len(analysis.get('unmatchedSenders', []))}")
 
-    # Get existing vendors
+    # Get existing vendor emails (the only column this script uses)
     print("\n📦 Getting existing vendors from database...")
-    existing = get_existing_vendors()
-    print(f"  Found {len(existing)} existing vendors")
-    existing_emails = {v[2].lower() if v[2] else "" for v in existing}
-
-    # Initialize Claude client
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+    existing_emails = get_existing_vendor_emails()
+    print(f"  Found {len(existing_emails)} existing vendor emails")
+
+    # Initialize Claude client (async - sender chunks are classified concurrently).
+    # Explicit keep-alive pool so concurrent chunks reuse warm TLS connections
+    # instead of paying a handshake each, plus client-side retries.
+    client = anthropic.AsyncAnthropic(
+        api_key=ANTHROPIC_API_KEY,
+        max_retries=3,
+        http_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=60.0,
+        ),
+    )
 
     # Search for SmartHaven specifically
     av_vendors = search_for_smarthaven(analysis, client)
@@ -289,7 +412,9 @@ def main():
     ]
     print(f"  Analyzing {len(unmatched_filtered[:100])} senders (top 100 by frequency)...")
 
-    potential_vendors = analyze_senders_with_claude(unmatched_filtered, client)
+    cache = open_classification_cache()
+    potential_vendors = asyncio.run(analyze_senders_with_claude(unmatched_filtered, client, cache))
+    cache.close()
 
     print(f"\n📋 Claude identified {len(potential_vendors)} potential property-related vendors:")
     for v in potential_vendors:
@@ -315,12 +440,13 @@ def main():
     # Save full analysis to file
     output_path = Path(__file__).parent.parent / "vendor-analysis-results.json"
     with open(output_path, "w") as f:
+        # No indent engages json's C-accelerated encoder
         json.dump({
             "analyzed_at": analysis.get("analyzedAt"),
             "av_vendors_found": av_vendors[:20] if av_vendors else [],
             "potential_vendors": potential_vendors,
             "added_vendors": high_confidence
-        }, f, indent=2)
+        }, f, ensure_ascii=False)
 
     print(f"\n💾 Full analysis saved to: vendor-analysis-results.json")
     print("\n✅ Vendor extraction complete!")
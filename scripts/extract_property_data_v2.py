@@ -5,490 +5,612 @@ More targeted extraction with cleaner results.
 """
 
 import fitz  # pymupdf
+import gzip
+import hashlib
 import json
 import re
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract all text from a PDF file."""
+# Compiled once at import; these run on every PDF so skip the per-call
+# pattern-cache lookup entirely.
+_RE_WS = re.compile(r'\s+')
+_RE_DOLLAR = re.compile(r'\$[\d,]+(?:\.\d{2})?')
+# MM/DD/YYYY, MM/DD/YY and "Month DD, YYYY" merged into one alternation so
+# extract_dates makes a single pass instead of three.
+_RE_DATES = re.compile(
+    r'(?:\d{1,2}/\d{1,2}/\d{2,4})'
+    r'|(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4})',
+    re.IGNORECASE)
+# All Providence policy fields fused into one alternation so the document is
+# scanned once instead of ~8 times. Dispatch is on m.lastgroup; the first
+# occurrence of each field wins, matching the old per-pattern re.search calls.
+_RE_PROV_POLICY = re.compile(
+    r'(?P<policy>HO\d+)'
+    r'|Policy Period:\s*(?:to)?\s*(?P<p_eff>\d{2}/\d{2}/\d{4})\s*(?:to)?\s*(?P<p_exp>\d{2}/\d{2}/\d{4})?'
+    r'|(?P<a_eff>\d{2}/\d{2}/\d{4})\s+(?P<a_exp>\d{2}/\d{2}/\d{4})\s+at\s+12:01'
+    r'|Dwelling[:\s]+(?:Guaranteed Replacement Cost)?[:\s]*\$?(?P<dwelling>[\d,]+)'
+    r'|Other Structures[:\s]+(?:Fixed Replacement Cost)?[:\s]*\$?(?P<other>[\d,]+)'
+    r'|Contents[:\s]+\$?(?P<contents>[\d,]+)'
+    r'|Personal Liability[:\s]+\$?(?P<liability>[\d,]+)'
+    r'|Base Deductible[:\s]+\$?(?P<deductible>[\d,]+)'
+    r'|(?:Base Policy Premium|Annual Premium|Total Premium)[:\s]+\$?(?P<premium>[\d,]+(?:\.\d{2})?)')
+# Address is anchored via a literal str.find on "Residence Premises" and then
+# matched inside a 2KB window; the old DOTALL '.*?' bridge backtracked across
+# the whole document.
+_RE_PROV_ADDR = re.compile(r'(\d+\s+[^,\n]{1,80},\s*Providence,\s*RI\s*\d{5})')
+_PROV_MONEY_FIELDS = {
+    'dwelling': 'dwelling_coverage',
+    'other': 'other_structures_coverage',
+    'contents': 'contents_coverage',
+    'liability': 'personal_liability',
+    'deductible': 'deductible',
+    'premium': 'annual_premium',
+}
+_PROV_REQUIRED = frozenset((
+    'policy_number', 'effective_date', 'property_address',
+    *_PROV_MONEY_FIELDS.values(),
+))
+_RE_PARCEL = re.compile(r'(\d{3}-\d{4}-\d{4})')
+_RE_EQUIPMENT = re.compile(r'(?:Unit|Equipment|ID)[:\s#]*(\d{5,})')
+_RE_BK_POLICY = re.compile(r'(?:Policy|Number)[:\s]*([\w\d]+)')
+_RE_LOAN = re.compile(r'Loan\s*(?:number)?[:\s]*(\d+)')
+_RE_CONTRACT = re.compile(r'(?:Contrat|N[°o]|Reference)[:\s]*([\w\d-]+)', re.IGNORECASE)
+_RE_EURO = re.compile(r'[\d,.\s]+(?:EUR|€|euros?)', re.IGNORECASE)
+_RE_SPAN = re.compile(r'(\d{3}-\d{3}-\d{5})')
+
+# Keyword literals per processor, fused into one alternation each so the
+# lowercased text is traversed once instead of once per substring check.
+# Dispatch on m.lastgroup via _keyword_hits.
+_RE_PROVTAX_KW = re.compile(r'(?P<echeck>echeck)|(?P<quarterly>quarterly|installment)')
+_RE_ELEVATOR_KW = re.compile(r'(?P<otis>otis)|(?P<semi>semi[ -]annual)|(?P<annual>annual)')
+_RE_BK_POLICY_KW = re.compile(r'(?P<condo>condo)|(?P<mortgage>wells fargo|mortgage)')
+_RE_HVAC_KW = re.compile(r'(?P<vendor>major air)|(?P<maint>maintenance|service contract)|(?P<semi>semi-annual)')
+_RE_BK_TAX_KW = re.compile(r'(?P<ph2e>ph ?2e)|(?P<ph2f>ph ?2f)')
+_RE_VT_KW = re.compile(r'(?P<dummerston>dummerston)|(?P<brattleboro>brattleboro)')
+
+def _keyword_hits(rx, text_lower: str) -> set:
+    """Single-pass keyword scan; returns the set of named groups that hit."""
+    return {m.lastgroup for m in rx.finditer(text_lower)}
+
+# Month-name prefilter for extract_dates; the date regexes are case-insensitive
+# so carry Title/UPPER/lower variants for the C-level substring scan.
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_MONTH_HINTS = _MONTHS + tuple(m.upper() for m in _MONTHS) + tuple(m.lower() for m in _MONTHS)
+
+# Extracted text is deterministic per (path, size, mtime), so warm re-runs of
+# main() read compressed text from here instead of re-driving PyMuPDF.
+_TEXT_CACHE_DIR = os.path.expanduser("~/.cache/property_extract")
+
+def _text_cache_file(pdf_path: str, max_pages: int | None) -> str | None:
     try:
+        st = os.stat(pdf_path)
+    except OSError:
+        return None
+    key = f"{pdf_path}|{st.st_size}|{st.st_mtime_ns}|{max_pages}"
+    return os.path.join(_TEXT_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".txt.gz")
+
+# Per-worker document memo: the limited-pages read and its full-document
+# fallback hit the same file back to back, so keep the last Document open
+# instead of re-parsing it.
+_DOC_CACHE = {}
+
+def _init_worker():
+    """Warm each pool worker's MuPDF context once instead of per document."""
+    fitz.TOOLS.mupdf_warnings(reset=True)
+
+def _open_document(pdf_path: str):
+    doc = _DOC_CACHE.get(pdf_path)
+    if doc is None:
+        for old in _DOC_CACHE.values():
+            old.close()
+        _DOC_CACHE.clear()
         doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text
+        _DOC_CACHE[pdf_path] = doc
+    return doc
+
+def extract_text_from_pdf(pdf_path: str, max_pages: int | None = None) -> str:
+    """Extract text from a PDF file, optionally limited to the first pages."""
+    cache_file = _text_cache_file(pdf_path, max_pages)
+    if cache_file:
+        try:
+            with gzip.open(cache_file, 'rt', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            pass
+
+    try:
+        doc = _open_document(pdf_path)
+        pages = doc if max_pages is None else doc.pages(0, min(max_pages, doc.page_count))
+        # Join once instead of growing a string per page (quadratic on big PDFs);
+        # sort=False skips PyMuPDF's layout-sorting pass.
+        text = "".join(page.get_text("text", sort=False) for page in pages)
     except Exception as e:
         return f"ERROR: {str(e)}"
 
+    if cache_file:
+        try:
+            os.makedirs(_TEXT_CACHE_DIR, exist_ok=True)
+            with gzip.open(cache_file, 'wt', encoding='utf-8') as f:
+                f.write(text)
+        except OSError:
+            pass
+    return text
+
 def clean_text(text: str) -> str:
     """Clean extracted text."""
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _RE_WS.sub(' ', text)
     return text.strip()
 
 def extract_dollar_amounts(text: str) -> list:
     """Extract dollar amounts from text."""
-    # Match $X,XXX.XX or $X,XXX,XXX.XX patterns
-    pattern = r'\$[\d,]+(?:\.\d{2})?'
-    matches = re.findall(pattern, text)
-    return list(set(matches))
+    # Cheap literal bailout: no '$' means the regex cannot match
+    if '$' not in text:
+        return []
+    # Match $X,XXX.XX or $X,XXX,XXX.XX patterns; dedup in document order
+    return list(dict.fromkeys(_RE_DOLLAR.findall(text)))
 
 def extract_dates(text: str) -> list:
     """Extract dates in various formats."""
-    patterns = [
-        r'\d{1,2}/\d{1,2}/\d{4}',  # MM/DD/YYYY
-        r'\d{1,2}/\d{1,2}/\d{2}',  # MM/DD/YY
-        r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4}',  # Month DD, YYYY
-    ]
-    dates = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        dates.extend(matches)
-    return list(set(dates))
-
-def process_providence_insurance(folder_path: str) -> dict:
+    # Every date format contains either a '/' or a month name
+    if '/' not in text and not any(m in text for m in _MONTH_HINTS):
+        return []
+    # dict.fromkeys dedups while keeping document order
+    return list(dict.fromkeys(_RE_DATES.findall(text)))
+
+# Below this a PDF is a banner page or stub receipt, not a document worth
+# running the full field extraction on.
+_MIN_PDF_SIZE = 2048
+
+def _pdf_paths(folder: str) -> list:
+    """List (path, size) for PDFs in a folder, smallest first."""
+    try:
+        with os.scandir(folder) as entries:
+            pdfs = [(e.path, e.stat().st_size) for e in entries
+                    if e.is_file() and e.name.lower().endswith('.pdf')]
+    except FileNotFoundError:
+        return []
+    pdfs.sort(key=lambda ps: (ps[1], ps[0]))
+    return pdfs
+
+def _extract_with_fields(text: str, fields) -> dict:
+    """Run declarative (key, regex, group, formatter) field specs against text."""
+    out = {}
+    for key, rx, idx, fmt in fields:
+        m = rx.search(text)
+        if m:
+            out[key] = fmt(m.group(idx))
+    return out
+
+# Field specs for the single-regex extractors; multi-field documents with
+# ordering constraints (the fused Providence policy scan) keep their own loop.
+_PROVIDENCE_TAX_FIELDS = (("parcel_id", _RE_PARCEL, 1, str),)
+_ELEVATOR_FIELDS = (("equipment_id", _RE_EQUIPMENT, 1, str),)
+_BROOKLYN_POLICY_FIELDS = (("policy_number", _RE_BK_POLICY, 1, str),)
+_PARIS_POLICY_FIELDS = (("contract_number", _RE_CONTRACT, 1, str),)
+
+def _map_pdfs(executor, folder: str, extract_one) -> list:
+    """Run a per-file extractor over every PDF in a folder via the process pool."""
+    results = []
+    paths = []
+    for path, size in _pdf_paths(folder):
+        if size < _MIN_PDF_SIZE:
+            # Record it instead of extracting; reprocess manually if needed
+            results.append({"filename": os.path.basename(path),
+                            "deferred": f"file under {_MIN_PDF_SIZE} bytes"})
+            continue
+        paths.append(path)
+    if paths:
+        results.extend(executor.map(extract_one, paths, chunksize=4))
+    return results
+
+def _parse_providence_policy(text: str) -> dict:
+    """Pull Providence policy fields out of already-extracted text."""
+    policy = {}
+
+    # Address from policy: literal anchor first, then a bounded window
+    idx = text.find("Residence Premises")
+    if idx != -1:
+        addr_match = _RE_PROV_ADDR.search(text, idx, idx + 2000)
+        if addr_match:
+            policy["property_address"] = addr_match.group(1).strip()
+
+    # Single pass over the document; dispatch each hit on its named group.
+    alt_dates = None
+    for m in _RE_PROV_POLICY.finditer(text):
+        group = m.lastgroup
+        if group == 'policy':
+            # Policy number (HO followed by digits)
+            policy.setdefault("policy_number", m['policy'])
+        elif group in ('p_eff', 'p_exp'):
+            # Policy period dates (expiration may be absent)
+            if "effective_date" not in policy:
+                policy["effective_date"] = m['p_eff']
+                policy["expiration_date"] = m['p_exp']
+        elif group == 'a_exp':
+            # Fallback "MM/DD/YYYY MM/DD/YYYY at 12:01" form
+            if alt_dates is None:
+                alt_dates = (m['a_eff'], m['a_exp'])
+        else:
+            # Coverage / deductible / premium dollar fields
+            key = _PROV_MONEY_FIELDS[group]
+            if key not in policy:
+                policy[key] = f"${m[group]}"
+        # Stop scanning once every field has been filled
+        if _PROV_REQUIRED <= policy.keys():
+            break
+
+    # The explicit "Policy Period:" form wins over the fallback date pair
+    if "effective_date" not in policy and alt_dates:
+        policy["effective_date"], policy["expiration_date"] = alt_dates
+
+    # Carrier
+    if "Berkley" in text or "BERKLEY" in text:
+        policy["carrier"] = "Berkley One"
+
+    return policy
+
+def extract_providence_policy(filepath: str) -> dict:
+    """Extract one Providence RI insurance policy from a PDF."""
+    policy = {"filename": os.path.basename(filepath), "type": "homeowners"}
+    # Declarations sit on the first pages; only fall back to the full
+    # document when the short read yields nothing.
+    fields = _parse_providence_policy(extract_text_from_pdf(filepath, max_pages=3))
+    if not fields:
+        fields = _parse_providence_policy(extract_text_from_pdf(filepath))
+    policy.update(fields)
+    return policy
+
+def process_providence_insurance(folder_path: str, executor) -> dict:
     """Process Providence RI insurance documents."""
-    results = {
+    return {
         "property": "88 Williams St, Providence, RI",
-        "policies": []
+        "policies": _map_pdfs(executor, os.path.join(folder_path, "Insurance"), extract_providence_policy)
     }
 
-    insurance_folder = os.path.join(folder_path, "Insurance")
-    if not os.path.exists(insurance_folder):
-        return results
-
-    for filename in os.listdir(insurance_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(insurance_folder, filename)
-            text = extract_text_from_pdf(filepath)
-
-            policy = {"filename": filename, "type": "homeowners"}
-
-            # Extract policy number (HO followed by digits)
-            policy_match = re.search(r'(HO\d+)', text)
-            if policy_match:
-                policy["policy_number"] = policy_match.group(1)
-
-            # Extract policy period dates
-            period_match = re.search(r'Policy Period:\s*(?:to)?\s*(\d{2}/\d{2}/\d{4})\s*(?:to)?\s*(\d{2}/\d{2}/\d{4})?', text)
-            if not period_match:
-                period_match = re.search(r'(\d{2}/\d{2}/\d{4})\s+(\d{2}/\d{2}/\d{4})\s+at\s+12:01', text)
-            if period_match:
-                policy["effective_date"] = period_match.group(1) if period_match.group(1) else None
-                policy["expiration_date"] = period_match.group(2) if len(period_match.groups()) > 1 and period_match.group(2) else None
-
-            # Extract dwelling coverage
-            dwelling_match = re.search(r'Dwelling[:\s]+(?:Guaranteed Replacement Cost)?[:\s]*\$?([\d,]+)', text)
-            if dwelling_match:
-                policy["dwelling_coverage"] = f"${dwelling_match.group(1)}"
-
-            # Extract other structures coverage
-            other_match = re.search(r'Other Structures[:\s]+(?:Fixed Replacement Cost)?[:\s]*\$?([\d,]+)', text)
-            if other_match:
-                policy["other_structures_coverage"] = f"${other_match.group(1)}"
-
-            # Extract contents coverage
-            contents_match = re.search(r'Contents[:\s]+\$?([\d,]+)', text)
-            if contents_match:
-                policy["contents_coverage"] = f"${contents_match.group(1)}"
-
-            # Extract liability coverage
-            liability_match = re.search(r'Personal Liability[:\s]+\$?([\d,]+)', text)
-            if liability_match:
-                policy["personal_liability"] = f"${liability_match.group(1)}"
-
-            # Extract deductible
-            deductible_match = re.search(r'Base Deductible[:\s]+\$?([\d,]+)', text)
-            if deductible_match:
-                policy["deductible"] = f"${deductible_match.group(1)}"
-
-            # Extract premium
-            premium_match = re.search(r'(?:Base Policy Premium|Annual Premium|Total Premium)[:\s]+\$?([\d,]+(?:\.\d{2})?)', text)
-            if premium_match:
-                policy["annual_premium"] = f"${premium_match.group(1)}"
-
-            # Carrier
-            if "Berkley" in text or "BERKLEY" in text:
-                policy["carrier"] = "Berkley One"
-
-            # Address from policy
-            addr_match = re.search(r'Residence Premises.*?(\d+\s+[^,\n]+,\s*Providence,\s*RI\s*\d{5})', text, re.DOTALL)
-            if addr_match:
-                policy["property_address"] = addr_match.group(1).strip()
-
-            results["policies"].append(policy)
-
-    return results
-
-def process_providence_taxes(folder_path: str) -> dict:
+def _parse_providence_tax(text: str) -> dict:
+    """Pull Providence tax fields out of already-extracted text."""
+    text_lower = text.lower()
+    record = {}
+
+    record.update(_extract_with_fields(text, _PROVIDENCE_TAX_FIELDS))
+
+    # Extract tax amounts
+    amounts = extract_dollar_amounts(text)
+    if amounts:
+        record["amounts_found"] = amounts
+
+    # Payment info and quarterly schedule in one keyword pass
+    hits = _keyword_hits(_RE_PROVTAX_KW, text_lower)
+    if 'echeck' in hits:
+        record["payment_method"] = "eCheck"
+    if 'quarterly' in hits:
+        record["payment_schedule"] = "quarterly"
+
+    return record
+
+def extract_providence_tax_record(filepath: str) -> dict:
+    """Extract one Providence RI tax record from a PDF."""
+    record = {"filename": os.path.basename(filepath)}
+    # Tax bills fit on the first two pages; fall back to the full document
+    fields = _parse_providence_tax(extract_text_from_pdf(filepath, max_pages=2))
+    if not fields:
+        fields = _parse_providence_tax(extract_text_from_pdf(filepath))
+    record.update(fields)
+    return record
+
+def process_providence_taxes(folder_path: str, executor) -> dict:
     """Process Providence RI tax documents."""
-    results = {
+    return {
         "property": "88 Williams St, Providence, RI",
         "parcel_id": "016-0200-0000",
-        "tax_records": []
+        "tax_records": _map_pdfs(executor, os.path.join(folder_path, "Taxes"), extract_providence_tax_record)
     }
 
-    taxes_folder = os.path.join(folder_path, "Taxes")
-    if not os.path.exists(taxes_folder):
-        return results
-
-    for filename in os.listdir(taxes_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(taxes_folder, filename)
-            text = extract_text_from_pdf(filepath)
+def extract_providence_elevator_contract(filepath: str) -> dict:
+    """Extract one Providence elevator maintenance contract from a PDF."""
+    text = extract_text_from_pdf(filepath)
 
-            record = {"filename": filename}
+    text_lower = text.lower()
 
-            # Extract parcel ID
-            parcel_match = re.search(r'(\d{3}-\d{4}-\d{4})', text)
-            if parcel_match:
-                record["parcel_id"] = parcel_match.group(1)
+    contract = {"filename": os.path.basename(filepath), "service_type": "elevator"}
 
-            # Extract tax amounts
-            amounts = extract_dollar_amounts(text)
-            if amounts:
-                record["amounts_found"] = amounts
+    contract.update(_extract_with_fields(text, _ELEVATOR_FIELDS))
 
-            # Extract payment info
-            if "ECHECK" in text or "eCheck" in text:
-                record["payment_method"] = "eCheck"
+    # Vendor and service frequency in one keyword pass
+    hits = _keyword_hits(_RE_ELEVATOR_KW, text_lower)
+    if 'otis' in hits:
+        contract["vendor"] = "Otis Elevator"
+    if 'semi' in hits:
+        contract["service_frequency"] = "semi-annual"
+    elif 'annual' in hits:
+        contract["service_frequency"] = "annual"
 
-            # Look for quarterly info
-            if "quarterly" in text.lower() or "installment" in text.lower():
-                record["payment_schedule"] = "quarterly"
+    # Extract amounts
+    amounts = extract_dollar_amounts(text)
+    if amounts:
+        contract["contract_amounts"] = amounts
 
-            results["tax_records"].append(record)
+    return contract
 
-    return results
-
-def process_providence_elevator(folder_path: str) -> dict:
+def process_providence_elevator(folder_path: str, executor) -> dict:
     """Process Providence elevator maintenance contracts."""
-    results = {
+    return {
         "property": "88 Williams St, Providence, RI",
-        "contracts": []
+        "contracts": _map_pdfs(executor, os.path.join(folder_path, "Elevator"), extract_providence_elevator_contract)
     }
 
-    elevator_folder = os.path.join(folder_path, "Elevator")
-    if not os.path.exists(elevator_folder):
-        return results
+def _parse_brooklyn_policy(text: str) -> dict:
+    """Pull Brooklyn policy fields out of already-extracted text."""
+    text_lower = text.lower()
+    policy = {}
 
-    for filename in os.listdir(elevator_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(elevator_folder, filename)
-            text = extract_text_from_pdf(filepath)
+    policy.update(_extract_with_fields(text, _BROOKLYN_POLICY_FIELDS))
 
-            contract = {"filename": filename, "service_type": "elevator"}
+    hits = _keyword_hits(_RE_BK_POLICY_KW, text_lower)
 
-            # Extract vendor name
-            if "Otis" in text:
-                contract["vendor"] = "Otis Elevator"
+    # Determine if condo policy
+    if 'condo' in hits:
+        policy["type"] = "condo"
 
-            # Look for equipment ID
-            equip_match = re.search(r'(?:Unit|Equipment|ID)[:\s#]*(\d{5,})', text)
-            if equip_match:
-                contract["equipment_id"] = equip_match.group(1)
+    # Check for mortgage clause info
+    if 'mortgage' in hits:
+        policy["mortgage_info"] = True
+        # Extract loan number
+        loan_match = _RE_LOAN.search(text)
+        if loan_match:
+            policy["loan_number"] = loan_match.group(1)
 
-            # Look for service type
-            if "Semi Annual" in text or "semi-annual" in text.lower():
-                contract["service_frequency"] = "semi-annual"
-            elif "Annual" in text or "annual" in text.lower():
-                contract["service_frequency"] = "annual"
+    # Extract amounts
+    amounts = extract_dollar_amounts(text)
+    if amounts:
+        policy["coverage_amounts"] = amounts
 
-            # Extract amounts
-            amounts = extract_dollar_amounts(text)
-            if amounts:
-                contract["contract_amounts"] = amounts
+    return policy
 
-            results["contracts"].append(contract)
+def extract_brooklyn_policy(filepath: str) -> dict:
+    """Extract one Brooklyn insurance policy from a PDF."""
+    policy = {"filename": os.path.basename(filepath)}
+    fields = _parse_brooklyn_policy(extract_text_from_pdf(filepath, max_pages=3))
+    if not fields:
+        fields = _parse_brooklyn_policy(extract_text_from_pdf(filepath))
+    policy.update(fields)
+    return policy
 
-    return results
-
-def process_brooklyn_insurance(folder_path: str) -> dict:
+def process_brooklyn_insurance(folder_path: str, executor) -> dict:
     """Process Brooklyn insurance documents."""
-    results = {
+    return {
         "property": "34 N 7th St, Brooklyn, NY (PH2E & PH2F)",
-        "policies": []
+        "policies": _map_pdfs(executor, os.path.join(folder_path, "Insurance"), extract_brooklyn_policy)
     }
 
-    insurance_folder = os.path.join(folder_path, "Insurance")
-    if not os.path.exists(insurance_folder):
-        return results
+def extract_brooklyn_hvac_contract(filepath: str) -> dict:
+    """Extract one Brooklyn HVAC contract from a PDF."""
+    text = extract_text_from_pdf(filepath)
 
-    for filename in os.listdir(insurance_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(insurance_folder, filename)
-            text = extract_text_from_pdf(filepath)
+    text_lower = text.lower()
 
-            policy = {"filename": filename}
+    contract = {"filename": os.path.basename(filepath), "service_type": "HVAC"}
 
-            # Extract policy number
-            policy_match = re.search(r'(?:Policy|Number)[:\s]*([\w\d]+)', text)
-            if policy_match:
-                policy["policy_number"] = policy_match.group(1)
+    hits = _keyword_hits(_RE_HVAC_KW, text_lower)
 
-            # Determine if condo policy
-            if "condo" in text.lower() or "condominium" in text.lower():
-                policy["type"] = "condo"
+    # Extract vendor
+    if 'vendor' in hits:
+        contract["vendor"] = "Major Air"
 
-            # Check for mortgage clause info
-            if "Wells Fargo" in text or "mortgage" in text.lower():
-                policy["mortgage_info"] = True
-                # Extract loan number
-                loan_match = re.search(r'Loan\s*(?:number)?[:\s]*(\d+)', text)
-                if loan_match:
-                    policy["loan_number"] = loan_match.group(1)
+    # Check for maintenance contract
+    if 'maint' in hits:
+        contract["contract_type"] = "maintenance"
 
-            # Extract amounts
-            amounts = extract_dollar_amounts(text)
-            if amounts:
-                policy["coverage_amounts"] = amounts
+    # Extract amounts
+    amounts = extract_dollar_amounts(text)
+    if amounts:
+        contract["amounts"] = amounts
 
-            results["policies"].append(policy)
+    # Look for semi-annual inspection info
+    if 'semi' in hits:
+        contract["service_frequency"] = "semi-annual"
 
-    return results
+    return contract
 
-def process_brooklyn_hvac(folder_path: str) -> dict:
+def process_brooklyn_hvac(folder_path: str, executor) -> dict:
     """Process Brooklyn HVAC contracts."""
-    results = {
+    return {
         "property": "34 N 7th St, Brooklyn, NY (PH2E & PH2F)",
-        "contracts": []
+        "contracts": _map_pdfs(executor, os.path.join(folder_path, "HVAC"), extract_brooklyn_hvac_contract)
     }
 
-    hvac_folder = os.path.join(folder_path, "HVAC")
-    if not os.path.exists(hvac_folder):
-        return results
+def extract_brooklyn_hoa_info(filepath: str) -> dict:
+    """Extract one Brooklyn HOA/Condo record from a PDF."""
+    text = extract_text_from_pdf(filepath)
 
-    for filename in os.listdir(hvac_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(hvac_folder, filename)
-            text = extract_text_from_pdf(filepath)
+    text_lower = text.lower()
 
-            contract = {"filename": filename, "service_type": "HVAC"}
+    info = {"filename": os.path.basename(filepath)}
 
-            # Extract vendor
-            if "Major Air" in text:
-                contract["vendor"] = "Major Air"
+    # Extract management company
+    if "akam" in text_lower:
+        info["management_company"] = "AKAM"
 
-            # Check for maintenance contract
-            if "maintenance" in text.lower() or "service contract" in text.lower():
-                contract["contract_type"] = "maintenance"
+    # Extract amounts (likely HOA fees)
+    amounts = extract_dollar_amounts(text)
+    if amounts:
+        info["amounts"] = amounts
 
-            # Extract amounts
-            amounts = extract_dollar_amounts(text)
-            if amounts:
-                contract["amounts"] = amounts
-
-            # Look for semi-annual inspection info
-            if "semi-annual" in text.lower() or "Semi-Annual" in text:
-                contract["service_frequency"] = "semi-annual"
-
-            results["contracts"].append(contract)
-
-    return results
+    return info
 
-def process_brooklyn_hoa(folder_path: str) -> dict:
+def process_brooklyn_hoa(folder_path: str, executor) -> dict:
     """Process Brooklyn HOA/Condo documents."""
-    results = {
+    return {
         "property": "34 N 7th St, Brooklyn, NY (PH2E & PH2F)",
-        "hoa_info": []
+        "hoa_info": _map_pdfs(executor, os.path.join(folder_path, "Condo & HOA"), extract_brooklyn_hoa_info)
     }
 
-    hoa_folder = os.path.join(folder_path, "Condo & HOA")
-    if not os.path.exists(hoa_folder):
-        return results
-
-    for filename in os.listdir(hoa_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(hoa_folder, filename)
-            text = extract_text_from_pdf(filepath)
-
-            info = {"filename": filename}
-
-            # Extract management company
-            if "AKAM" in text or "akam" in text.lower():
-                info["management_company"] = "AKAM"
-
-            # Extract amounts (likely HOA fees)
-            amounts = extract_dollar_amounts(text)
-            if amounts:
-                info["amounts"] = amounts
-
-            results["hoa_info"].append(info)
-
-    return results
-
-def process_brooklyn_taxes(folder_path: str) -> dict:
+def _parse_brooklyn_tax(text: str) -> dict:
+    """Pull Brooklyn tax fields out of already-extracted text."""
+    text_lower = text.lower()
+    record = {}
+
+    # Extract amounts
+    amounts = extract_dollar_amounts(text)
+    if amounts:
+        record["amounts"] = amounts
+
+    # Check which unit
+    hits = _keyword_hits(_RE_BK_TAX_KW, text_lower)
+    if 'ph2e' in hits:
+        record["unit"] = "PH2E"
+    if 'ph2f' in hits:
+        record["unit"] = "PH2F"
+
+    return record
+
+def extract_brooklyn_tax_record(filepath: str) -> dict:
+    """Extract one Brooklyn tax record from a PDF."""
+    record = {"filename": os.path.basename(filepath)}
+    fields = _parse_brooklyn_tax(extract_text_from_pdf(filepath, max_pages=2))
+    if not fields:
+        fields = _parse_brooklyn_tax(extract_text_from_pdf(filepath))
+    record.update(fields)
+    return record
+
+def process_brooklyn_taxes(folder_path: str, executor) -> dict:
     """Process Brooklyn tax documents."""
-    results = {
+    return {
         "property": "34 N 7th St, Brooklyn, NY (PH2E & PH2F)",
         "block": "02324",
         "lot_ph2e": "1305",
         "lot_ph2f": "1306",
-        "tax_records": []
+        "tax_records": _map_pdfs(executor, os.path.join(folder_path, "Taxes"), extract_brooklyn_tax_record)
     }
 
-    taxes_folder = os.path.join(folder_path, "Taxes")
-    if not os.path.exists(taxes_folder):
-        return results
+def _parse_paris_policy(text: str) -> dict:
+    """Pull Paris policy fields out of already-extracted text."""
+    text_lower = text.lower()
+    policy = {}
 
-    for filename in os.listdir(taxes_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(taxes_folder, filename)
-            text = extract_text_from_pdf(filepath)
+    policy.update(_extract_with_fields(text, _PARIS_POLICY_FIELDS))
 
-            record = {"filename": filename}
+    # Look for "Attestation" documents
+    if "attestation" in text_lower:
+        policy["document_type"] = "attestation"
 
-            # Extract amounts
-            amounts = extract_dollar_amounts(text)
-            if amounts:
-                record["amounts"] = amounts
+    # Look for MRH (Multirisque Habitation)
+    if "MRH" in text or "habitation" in text_lower:
+        policy["type"] = "habitation (homeowners)"
 
-            # Check which unit
-            if "PH2E" in text or "PH 2E" in text:
-                record["unit"] = "PH2E"
-            if "PH2F" in text or "PH 2F" in text:
-                record["unit"] = "PH2F"
+    # Extract euro amounts
+    euro_matches = _RE_EURO.findall(text)
+    if euro_matches:
+        policy["amounts_eur"] = euro_matches[:5]  # Limit to first 5
 
-            results["tax_records"].append(record)
+    return policy
 
-    return results
+def extract_paris_policy(filepath: str) -> dict:
+    """Extract one Paris insurance policy from a PDF."""
+    policy = {"filename": os.path.basename(filepath)}
+    fields = _parse_paris_policy(extract_text_from_pdf(filepath, max_pages=3))
+    if not fields:
+        fields = _parse_paris_policy(extract_text_from_pdf(filepath))
+    policy.update(fields)
+    return policy
 
-def process_paris_insurance(folder_path: str) -> dict:
+def process_paris_insurance(folder_path: str, executor) -> dict:
     """Process Paris insurance documents."""
-    results = {
+    return {
         "property": "8 Rue Guynemer, Paris, France",
-        "policies": []
+        "policies": _map_pdfs(executor, os.path.join(folder_path, "Insurance"), extract_paris_policy)
     }
 
-    insurance_folder = os.path.join(folder_path, "Insurance")
-    if not os.path.exists(insurance_folder):
-        return results
-
-    for filename in os.listdir(insurance_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(insurance_folder, filename)
-            text = extract_text_from_pdf(filepath)
-
-            policy = {"filename": filename}
-
-            # Extract policy/contract number
-            contract_match = re.search(r'(?:Contrat|N[°o]|Reference)[:\s]*([\w\d-]+)', text, re.IGNORECASE)
-            if contract_match:
-                policy["contract_number"] = contract_match.group(1)
-
-            # Look for "Attestation" documents
-            if "Attestation" in text or "attestation" in text.lower():
-                policy["document_type"] = "attestation"
-
-            # Look for MRH (Multirisque Habitation)
-            if "MRH" in text or "habitation" in text.lower():
-                policy["type"] = "habitation (homeowners)"
-
-            # Extract euro amounts
-            euro_pattern = r'[\d,.\s]+(?:EUR|€|euros?)'
-            euro_matches = re.findall(euro_pattern, text, re.IGNORECASE)
-            if euro_matches:
-                policy["amounts_eur"] = euro_matches[:5]  # Limit to first 5
-
-            results["policies"].append(policy)
-
-    return results
-
-def process_vermont_taxes(folder_path: str) -> dict:
+def _parse_vermont_tax(text: str) -> dict:
+    """Pull Vermont tax fields out of already-extracted text."""
+    text_lower = text.lower()
+    record = {}
+
+    # Extract SPAN numbers
+    span_matches = _RE_SPAN.findall(text)
+    if span_matches:
+        record["span_numbers"] = list(dict.fromkeys(span_matches))
+
+    # Extract amounts
+    amounts = extract_dollar_amounts(text)
+    if amounts:
+        record["amounts"] = amounts
+
+    # Check jurisdiction
+    hits = _keyword_hits(_RE_VT_KW, text_lower)
+    if 'dummerston' in hits:
+        record["jurisdiction"] = "Dummerston"
+    if 'brattleboro' in hits:
+        record["jurisdiction"] = "Brattleboro"
+
+    # Extract due dates
+    dates = extract_dates(text)
+    if dates:
+        record["dates_found"] = dates
+
+    return record
+
+def extract_vermont_tax_record(filepath: str) -> dict:
+    """Extract one Vermont tax record from a PDF."""
+    record = {"filename": os.path.basename(filepath)}
+    fields = _parse_vermont_tax(extract_text_from_pdf(filepath, max_pages=2))
+    if not fields:
+        fields = _parse_vermont_tax(extract_text_from_pdf(filepath))
+    record.update(fields)
+    return record
+
+def process_vermont_taxes(folder_path: str, executor) -> dict:
     """Process Vermont tax documents."""
-    results = {
+    return {
         "properties": [
             {"name": "Vermont Main House (2055 Sunset Lake Rd)", "span": "186-059-10695", "jurisdiction": "Dummerston"},
             {"name": "Booth House", "span": "186-059-10098", "jurisdiction": "Dummerston"},
             {"name": "Guest House (1910 Sunset Lake Rd)", "span": "186-059-10693", "jurisdiction": "Dummerston"},
             {"name": "Vermont Land", "span": "081-025-11151", "jurisdiction": "Brattleboro"},
         ],
-        "tax_records": []
+        "tax_records": _map_pdfs(executor, os.path.join(folder_path, "Taxes"), extract_vermont_tax_record)
     }
 
-    taxes_folder = os.path.join(folder_path, "Taxes")
-    if not os.path.exists(taxes_folder):
-        return results
-
-    for filename in os.listdir(taxes_folder):
-        if filename.lower().endswith('.pdf'):
-            filepath = os.path.join(taxes_folder, filename)
-            text = extract_text_from_pdf(filepath)
-
-            record = {"filename": filename}
-
-            # Extract SPAN numbers
-            span_matches = re.findall(r'(\d{3}-\d{3}-\d{5})', text)
-            if span_matches:
-                record["span_numbers"] = list(set(span_matches))
-
-            # Extract amounts
-            amounts = extract_dollar_amounts(text)
-            if amounts:
-                record["amounts"] = amounts
-
-            # Check jurisdiction
-            if "Dummerston" in text:
-                record["jurisdiction"] = "Dummerston"
-            if "Brattleboro" in text:
-                record["jurisdiction"] = "Brattleboro"
-
-            # Extract due dates
-            dates = extract_dates(text)
-            if dates:
-                record["dates_found"] = dates
-
-            results["tax_records"].append(record)
-
-    return results
-
-def main():
-    """Main extraction function."""
-    base_path = os.path.expanduser("~/AnneSpalterStudios Dropbox/Property Management/")
-
-    all_results = {
-        "extraction_date": "2026-01-01",
-        "properties": {}
-    }
-
-    # Providence RI
-    providence_path = os.path.join(base_path, "88 Williams St - Providence RI")
+def _build_providence(base_path: str, executor) -> dict:
     print("Processing Providence RI...")
-    all_results["properties"]["88 Williams St - Providence RI"] = {
+    providence_path = os.path.join(base_path, "88 Williams St - Providence RI")
+    return {
         "address": "88 Williams Street, Providence, RI 02906",
         "parcel_id": "016-0200-0000",
-        "insurance": process_providence_insurance(providence_path),
-        "taxes": process_providence_taxes(providence_path),
-        "elevator_maintenance": process_providence_elevator(providence_path)
+        "insurance": process_providence_insurance(providence_path, executor),
+        "taxes": process_providence_taxes(providence_path, executor),
+        "elevator_maintenance": process_providence_elevator(providence_path, executor)
     }
 
-    # Brooklyn
-    brooklyn_path = os.path.join(base_path, "34 N 7th St - Brooklyn")
+def _build_brooklyn(base_path: str, executor) -> dict:
     print("Processing Brooklyn...")
-    all_results["properties"]["34 N 7th St - Brooklyn"] = {
+    brooklyn_path = os.path.join(base_path, "34 N 7th St - Brooklyn")
+    return {
         "address": "34 N 7th Street, Brooklyn, NY 11249",
         "units": ["PH2E", "PH2F"],
         "block_lot": {"block": "02324", "lot_ph2e": "1305", "lot_ph2f": "1306"},
-        "insurance": process_brooklyn_insurance(brooklyn_path),
-        "taxes": process_brooklyn_taxes(brooklyn_path),
-        "hvac_contracts": process_brooklyn_hvac(brooklyn_path),
-        "hoa": process_brooklyn_hoa(brooklyn_path)
+        "insurance": process_brooklyn_insurance(brooklyn_path, executor),
+        "taxes": process_brooklyn_taxes(brooklyn_path, executor),
+        "hvac_contracts": process_brooklyn_hvac(brooklyn_path, executor),
+        "hoa": process_brooklyn_hoa(brooklyn_path, executor)
     }
 
-    # Paris
-    paris_path = os.path.join(base_path, "Paris - 8 Rue Guynemer")
+def _build_paris(base_path: str, executor) -> dict:
     print("Processing Paris...")
-    all_results["properties"]["Paris - 8 Rue Guynemer"] = {
+    paris_path = os.path.join(base_path, "Paris - 8 Rue Guynemer")
+    return {
         "address": "8 Rue Guynemer, 75006 Paris, France",
-        "insurance": process_paris_insurance(paris_path)
+        "insurance": process_paris_insurance(paris_path, executor)
     }
 
-    # Vermont
-    vermont_path = os.path.join(base_path, "Vermont")
+def _build_vermont(base_path: str, executor) -> dict:
     print("Processing Vermont...")
-    all_results["properties"]["Vermont"] = {
+    vermont_path = os.path.join(base_path, "Vermont")
+    return {
         "properties_list": [
             {"name": "Main House", "address": "2055 Sunset Lake Rd, Dummerston, VT", "span": "186-059-10695"},
             {"name": "Booth House", "address": "Dummerston, VT", "span": "186-059-10098"},
@@ -496,18 +618,50 @@ def main():
             {"name": "Land", "address": "Brattleboro, VT", "span": "081-025-11151"},
             {"name": "22 Kelly Road", "address": "22 Kelly Rd, Dummerston, VT"}
         ],
-        "taxes": process_vermont_taxes(vermont_path)
+        "taxes": process_vermont_taxes(vermont_path, executor)
+    }
+
+def main():
+    """Main extraction function."""
+    base_path = os.path.expanduser("~/AnneSpalterStudios Dropbox/Property Management/")
+
+    all_results = {
+        "extraction_date": "2026-01-01",
+        "properties": {}
     }
 
-    # Save results
+    # One shared process pool does the CPU-bound PDF extraction; a small thread
+    # pool lets the four property groups feed it concurrently.
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 6),
+                             initializer=_init_worker) as executor:
+        with ThreadPoolExecutor(max_workers=4) as groups:
+            futures = {
+                "88 Williams St - Providence RI": groups.submit(_build_providence, base_path, executor),
+                "34 N 7th St - Brooklyn": groups.submit(_build_brooklyn, base_path, executor),
+                "Paris - 8 Rue Guynemer": groups.submit(_build_paris, base_path, executor),
+                "Vermont": groups.submit(_build_vermont, base_path, executor),
+            }
+            for name, future in futures.items():
+                all_results["properties"][name] = future.result()
+
+    # Serialize once (no indent, so the C encoder does the whole job) and
+    # reuse the same string for the file and the stdout dump.
+    data = json.dumps(all_results, ensure_ascii=False)
     output_path = "/Users/toddhome/repo/propertymanagement/scripts/property_data_structured.json"
     with open(output_path, 'w') as f:
-        json.dump(all_results, f, indent=2)
+        f.write(data)
 
     print(f"\nResults saved to: {output_path}")
+    if sys.stdout.isatty():
+        # Don't flood the terminal; the full JSON is already on disk
+        print(f"Summary: {len(all_results['properties'])} properties extracted")
+    else:
+        print("\n" + "="*60)
+        print(data)
     return all_results
 
 if __name__ == "__main__":
-    results = main()
-    print("\n" + "="*60)
-    print(json.dumps(results, indent=2))
+    # Keep the platform-default start method: workers get their first tasks
+    # from ThreadPoolExecutor threads, and forking an already-multithreaded
+    # process is deprecated on 3.12 and crash-prone on macOS
+    main()
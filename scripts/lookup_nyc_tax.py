@@ -14,23 +14,119 @@ import sys
 import json
 import re
 import argparse
+import asyncio
+import types
+from collections import defaultdict
 from datetime import datetime
+from html.parser import HTMLParser
 
 sys.path.insert(0, '/Users/toddhome/Library/Python/3.12/lib/python/site-packages')
 
+import requests
 from playwright.sync_api import sync_playwright
-import time
+import atexit
 
 PORTAL_URL = "https://a836-pts-access.nyc.gov/care/search/commonsearch.aspx?mode=persprop"
 DATALET_URL = "https://a836-pts-access.nyc.gov/care/datalets/datalet.aspx"
 
-BOROUGHS = {
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+# Read-only view: never mutated at runtime, shared by all parsers
+BOROUGHS = types.MappingProxyType({
     '1': 'Manhattan',
     '2': 'Bronx',
     '3': 'Brooklyn',
     '4': 'Queens',
     '5': 'Staten Island'
-}
+})
+
+# Compiled once at import; the parsers run per scraped page and skip the
+# re module's per-call cache lookup.
+# Lazy bounded runs before the street-suffix alternations: the old greedy
+# [A-Z\s]+ backtracked from the end of the caps run for every candidate
+# suffix, which is quadratic on long headers
+_ADDR_HEADER_RE = re.compile(r'(\d+\s+[A-Z0-9\s#]{1,80}?STREET[^,\n]*)', re.IGNORECASE)
+# Payment history row: Credited Date | Activity Date | -$Amount | Year
+_PAYMENT_RE = re.compile(r'(\d{2}/\d{2}/\d{4})\s+(\d{2}/\d{2}/\d{4})\s+-\$?([\d,]+\.?\d*)\s+(\d{4})')
+_BILL_ADDR_RE = re.compile(r'(\d+\s+[A-Z0-9\s#]+(?:STREET|ST|AVENUE|AVE|ROAD|RD)?[^,\n]*)', re.IGNORECASE)
+# Label/amount patterns fused into one alternation per parser so the page
+# text is scanned once; _first_hits records the first match per named group
+# and the priority tuples preserve the old pattern ordering.
+_AMOUNT_RE = re.compile(
+    r'Amount\s+Due[:\s]*\$?(?P<amtdue>[\d,]+\.?\d*)'
+    r'|Total\s+Due[:\s]*\$?(?P<total>[\d,]+\.?\d*)'
+    r'|Current\s+Amount[:\s]*\$?(?P<current>[\d,]+\.?\d*)'
+    r'|Tax\s+Amount[:\s]*\$?(?P<tax>[\d,]+\.?\d*)'
+    r'|Quarterly\s+Amount[:\s]*\$?(?P<quarterly>[\d,]+\.?\d*)'
+    r'|Balance[:\s]*\$?(?P<balance>[\d,]+\.?\d*)'
+    r'|\$\s*(?P<generic>[\d,]+\.\d{2})',  # Generic dollar amount
+    re.IGNORECASE)
+_AMOUNT_PRIORITY = ('amtdue', 'total', 'current', 'tax', 'quarterly', 'balance', 'generic')
+_DUE_RE = re.compile(
+    r'Due\s+Date[:\s]*(?P<duedate>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
+    r'|Due[:\s]*(?P<due>\w+\s+\d{1,2},?\s+\d{4})'
+    r'|(?P<month>January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
+    re.IGNORECASE)
+_DUE_PRIORITY = ('duedate', 'due', 'month')
+_QUARTER_RE = re.compile(r'Q([1-4])|Quarter\s*([1-4])', re.IGNORECASE)
+_RESULT_ADDR_RE = re.compile(
+    r'Address[:\s]+(?P<label>[^\n]+)'
+    r'|(?P<street>\d+\s+[A-Z\s]{1,80}?(?:STREET|ST|AVENUE|AVE|ROAD|RD|PLACE|PL|DRIVE|DR)\b)',
+    re.IGNORECASE)
+_RESULT_ADDR_PRIORITY = ('street', 'label')
+_OWNER_RE = re.compile(r'Owner[:\s]+([^\n]+)', re.IGNORECASE)
+_TAX_RE = re.compile(
+    r'Tax\s+Amount[:\s]*\$?(?P<tax>[\d,]+\.?\d*)'
+    r'|Annual\s+Tax[:\s]*\$?(?P<annual>[\d,]+\.?\d*)'
+    r'|Property\s+Tax[:\s]*\$?(?P<property>[\d,]+\.?\d*)'
+    r'|Total\s+Tax[:\s]*\$?(?P<totaltax>[\d,]+\.?\d*)'
+    r'|Amount\s+Due[:\s]*\$?(?P<amtdue>[\d,]+\.?\d*)'
+    r'|Current\s+Amount[:\s]*\$?(?P<current>[\d,]+\.?\d*)'
+    r'|Quarterly\s+Amount[:\s]*\$?(?P<quarterly>[\d,]+\.?\d*)'
+    r'|\$\s*(?P<generic>[\d,]+\.\d{2})',  # Generic dollar amount
+    re.IGNORECASE)
+_TAX_PRIORITY = ('tax', 'annual', 'property', 'totaltax', 'amtdue', 'current', 'quarterly', 'generic')
+_ABATEMENT_RE = re.compile(r'421[-\s]?[aA]')
+# One case-insensitive scan instead of lowercasing the whole page text
+_ABATEMENT_KW_RE = re.compile(r'421|abatement', re.IGNORECASE)
+_ASSESSED_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'Assessed\s+Value[:\s]*\$?([\d,]+)',
+    r'Assessment[:\s]*\$?([\d,]+)',
+))
+_MARKET_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'Market\s+Value[:\s]*\$?([\d,]+)',
+    r'Full\s+Value[:\s]*\$?([\d,]+)',
+))
+_YEAR_RANGE_RE = re.compile(r'(202[4-9])[/-](202[5-9])')
+_FY_RE = re.compile(r'FY\s*(202[5-9])', re.IGNORECASE)
+
+
+def _first_hits(rx, text: str) -> dict:
+    """Record the first match per named group in a single pass over text."""
+    first = {}
+    total = len(rx.groupindex)
+    for m in rx.finditer(text):
+        group = m.lastgroup
+        if group not in first:
+            first[group] = m.group(group)
+            if len(first) == total:
+                break
+    return first
+
+
+def _pick_amount(hits: dict, priority: tuple, limit: float):
+    """Return the first parseable in-range amount following pattern priority."""
+    for group in priority:
+        value = hits.get(group)
+        if value is None:
+            continue
+        try:
+            amount = float(value.replace(',', ''))
+        except ValueError:
+            continue
+        if 0 < amount < limit:
+            return amount
+    return None
 
 
 def format_pin(boro: str, block: str, lot: str) -> str:
@@ -38,175 +134,442 @@ def format_pin(boro: str, block: str, lot: str) -> str:
     return f"{boro}{block.zfill(5)}{lot.zfill(4)}"
 
 
-def lookup_nyc_tax(boro: str, block: str, lot: str) -> dict:
-    """Look up NYC property tax via NYC Finance PTS Access portal.
-
-    Uses the Payment History page which shows actual amounts paid by tax year.
-    """
-
-    pin = format_pin(boro, block, lot)
+def _result_skeleton(boro: str, block: str, lot: str, pin: str = None) -> dict:
+    """Shared base result dict for the lookup and both parsers."""
     result = {
         'success': False,
         'boro': boro,
         'block': block,
         'lot': lot,
-        'pin': pin,
         'borough_name': BOROUGHS.get(boro, 'Unknown'),
-        'scraped_at': datetime.now().isoformat()
     }
+    if pin is not None:
+        result['pin'] = pin
+    return result
+
+
+# Resources the parsers never read; Chromium would still download and
+# decode them. CSS is kept — the visibility waits depend on layout.
+_BLOCKED_RESOURCES = frozenset({'image', 'font', 'media'})
+_BLOCKED_HOSTS = ('google-analytics', 'googletagmanager', 'doubleclick', 'hotjar')
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+def _block_extras(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCES or any(h in request.url for h in _BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+async def _block_extras_async(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCES or any(h in request.url for h in _BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# One Chromium instance shared across lookups — launching the browser is the
+# dominant fixed cost of a batch run. The profile dir persists cookies and
+# the HTTP cache across runs, so repeat lookups skip re-downloading the
+# portal's static JS/CSS.
+_PROFILE_DIR = '/tmp/nyc_pts_profile'
+_PW = None
+_CONTEXT = None
+
+
+def _shutdown_browser():
+    global _PW, _CONTEXT
+    if _CONTEXT is not None:
+        _CONTEXT.close()
+        _CONTEXT = None
+    if _PW is not None:
+        _PW.stop()
+        _PW = None
+
+
+def _get_context():
+    """Lazily start the shared headless Chromium with a persistent profile."""
+    global _PW, _CONTEXT
+    if _CONTEXT is None:
+        _PW = sync_playwright().start()
+        _CONTEXT = _PW.chromium.launch_persistent_context(
+            user_data_dir=_PROFILE_DIR,
+            headless=True,
+            user_agent=USER_AGENT
         )
-        page = context.new_page()
+        _CONTEXT.route('**/*', _block_extras)
+        atexit.register(_shutdown_browser)
+    return _CONTEXT
+
+
+class _TextExtractor(HTMLParser):
+    """Minimal visible-text extractor; enough for the datalet regexes."""
+
+    _SKIP = frozenset({'script', 'style'})
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            data = data.strip()
+            if data:
+                self._chunks.append(data)
+
+    def text(self) -> str:
+        return '\n'.join(self._chunks)
+
+
+class _TableExtractor(HTMLParser):
+    """Collect table rows as (table id/class, cell texts) for structural parsing."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._tables = []
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            attrs = dict(attrs)
+            self._tables.append(f"{attrs.get('id') or ''} {attrs.get('class') or ''}")
+        elif tag == 'tr':
+            self._row = []
+        elif tag in ('td', 'th'):
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th') and self._cell is not None:
+            if self._row is not None:
+                self._row.append(' '.join(self._cell).strip())
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            if self._row:
+                self.rows.append((self._tables[-1] if self._tables else '', self._row))
+            self._row = None
+        elif tag == 'table' and self._tables:
+            self._tables.pop()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            data = data.strip()
+            if data:
+                self._cell.append(data)
+
+
+_DATE_CELL_RE = re.compile(r'\d{2}/\d{2}/\d{4}$')
+_YEAR_CELL_RE = re.compile(r'(20\d{2})$')
+
+
+def _fetch_payment_history(payment_url: str) -> str | None:
+    """Fetch the datalet page over plain HTTP and return its raw HTML.
+
+    The Payment History page is server-rendered ASP.NET — the JS on it is
+    incidental, so a direct GET returns the same table a full Chromium load
+    would, in a fraction of the time and memory. Returns None when the
+    response lacks the table (JS challenge or error page) so the caller can
+    fall back to the browser.
+    """
+    resp = requests.get(payment_url, headers={'User-Agent': USER_AGENT}, timeout=30)
+    resp.raise_for_status()
+    if 'Payment History' not in resp.text:
+        return None
+    return resp.text
+
+
+def _visible_text(html: str) -> str:
+    """Flatten datalet HTML to the visible text the regex parsers consume."""
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    text = extractor.text()
+    start = text.find('Payment History')
+    if start == -1:
+        return text
+    end = text.find('Copyright', start + 1)
+    return text[start:end if end != -1 else len(text)]
+
+
+def _parse_payment_rows(html: str) -> list | None:
+    """Pull payment rows straight out of the table structure.
+
+    One tree walk over labeled cells beats re-scanning the flattened page
+    text and cannot false-positive on dollar amounts from unrelated cells.
+    Returns None when no row matches so the caller can fall back to the
+    regex scan.
+    """
+    extractor = _TableExtractor()
+    extractor.feed(html)
+    # Only walk the tables the old CSS selector would have targeted; fall
+    # back to every row when the page lacks the expected markers
+    rows = [cells for table, cells in extractor.rows
+            if 'Payment_History' in table or 'datalet' in table]
+    if not rows:
+        rows = [cells for _, cells in extractor.rows]
+    payments = []
+    for row in rows:
+        if len(row) < 4:
+            continue
+        credited, activity, amount_cell, year_cell = row[0], row[1], row[2], row[3]
+        if not (_DATE_CELL_RE.match(credited) and _DATE_CELL_RE.match(activity)):
+            continue
+        year_match = _YEAR_CELL_RE.match(year_cell)
+        if not year_match or not amount_cell.startswith('-'):
+            continue
+        try:
+            amount = float(amount_cell.lstrip('-$').replace(',', ''))
+        except ValueError:
+            continue
+        if amount > 0:
+            payments.append({
+                'credited_date': credited,
+                'activity_date': activity,
+                'amount': amount,
+                'tax_year': int(year_match.group(1))
+            })
+    return payments or None
+
+
+def lookup_nyc_tax(boro: str, block: str, lot: str, context=None, debug=False) -> dict:
+    """Look up NYC property tax via NYC Finance PTS Access portal.
+
+    Uses the Payment History page which shows actual amounts paid by tax year.
+    """
+
+    pin = format_pin(boro, block, lot)
+    result = _result_skeleton(boro, block, lot, pin)
+    result['scraped_at'] = datetime.now().isoformat()
+
+    # Payment History page which shows actual amounts paid
+    payment_url = f"{DATALET_URL}?mode=pa_pymts_hist&UseSearch=no&pin={pin}&jur=65&taxyr=2026&LMparent=20"
+
+    # Fast path: fetch the server-rendered table directly; Chromium is only
+    # a fallback for when the portal serves a JS challenge instead
+    body_text = None
+    payments = None
+    try:
+        print(f"[NYC Tax] Fetching Payment History: {payment_url}...")
+        html = _fetch_payment_history(payment_url)
+        if html is not None:
+            payments = _parse_payment_rows(html)
+            body_text = _visible_text(html)
+    except Exception as fetch_error:
+        print(f"[NYC Tax] Direct fetch failed ({fetch_error}); falling back to browser")
+
+    if body_text is None:
+        if context is None:
+            context = _get_context()
+        # Reuse the restored tab so session state survives between lookups
+        page = context.pages[0] if context.pages else context.new_page()
 
         try:
-            # Go to Payment History page which shows actual amounts paid
-            payment_url = f"{DATALET_URL}?mode=pa_pymts_hist&UseSearch=no&pin={pin}&jur=65&taxyr=2026&LMparent=20"
             print(f"[NYC Tax] Navigating to Payment History: {payment_url}...")
-            page.goto(payment_url, timeout=60000)
-            time.sleep(3)
-
-            page.wait_for_load_state('networkidle', timeout=30000)
-            page.screenshot(path='/tmp/nyc_tax_1_payments.png')
-            print("[NYC Tax] Screenshot saved: /tmp/nyc_tax_1_payments.png")
-
-            # Get page content
-            body_text = page.locator('body').inner_text()
-            html_content = page.content()
-
-            # Save HTML for debugging
-            with open('/tmp/nyc_tax_page.html', 'w') as f:
-                f.write(html_content)
-            print("[NYC Tax] HTML saved to /tmp/nyc_tax_page.html")
-
-            # Extract address from header
-            addr_match = re.search(r'(\d+\s+[A-Z0-9\s#]+STREET[^,\n]*)', body_text, re.IGNORECASE)
-            if addr_match:
-                result['address'] = addr_match.group(1).strip()
-
-            # Parse payment history table
-            # Format: Credited Date | Activity Date | Amount | Year
-            payments = []
-
-            # Look for dollar amounts with year context
-            # Pattern: date | date | -$amount | year
-            payment_pattern = r'(\d{2}/\d{2}/\d{4})\s+(\d{2}/\d{2}/\d{4})\s+-\$?([\d,]+\.?\d*)\s+(\d{4})'
-            matches = re.findall(payment_pattern, body_text)
-
-            for match in matches:
-                credited_date, activity_date, amount_str, year = match
-                try:
-                    amount = float(amount_str.replace(',', ''))
-                    if amount > 0:
-                        payments.append({
-                            'credited_date': credited_date,
-                            'activity_date': activity_date,
-                            'amount': amount,
-                            'tax_year': int(year)
-                        })
-                        print(f"[NYC Tax] Payment: ${amount} for year {year} on {credited_date}")
-                except:
-                    continue
-
-            # Group payments by tax year
-            by_year = {}
-            for payment in payments:
-                year = payment['tax_year']
-                if year not in by_year:
-                    by_year[year] = {'total': 0, 'payments': []}
-                by_year[year]['total'] += payment['amount']
-                by_year[year]['payments'].append(payment)
-
-            result['payments_by_year'] = by_year
-
-            # Get most recent year's total
-            if by_year:
-                latest_year = max(by_year.keys())
-                result['tax_year'] = latest_year
-                result['tax_amount'] = by_year[latest_year]['total']
-                result['success'] = True
-                print(f"[NYC Tax] Latest year {latest_year}: ${result['tax_amount']:.2f}")
+            page.goto(payment_url, timeout=60000, wait_until='domcontentloaded')
+            # Wait for the table the parser consumes rather than networkidle,
+            # which tracking beacons routinely hold open for the full timeout
+            try:
+                page.locator('table#Payment_History, table.datalet_section').first.wait_for(timeout=20000)
+            except Exception:
+                # Error pages lack the datalet table; surface them quickly
+                page.wait_for_selector('text=/Payment History|Error/', timeout=5000)
+            # Screenshot + HTML dump force a paint and a full-DOM serialize per
+            # call; only pay for them when debugging
+            if debug:
+                page.screenshot(path='/tmp/nyc_tax_1_payments.png')
+                print("[NYC Tax] Screenshot saved: /tmp/nyc_tax_1_payments.png")
+                with open('/tmp/nyc_tax_page.html', 'w') as f:
+                    f.write(page.content())
+                print("[NYC Tax] HTML saved to /tmp/nyc_tax_page.html")
+
+            # Get page content, narrowed to the datalet tables — the rest of
+            # the body is portal chrome the regexes would scan for nothing
+            datalet_texts = page.locator('#datalet_div, table.datalet_header, table.datalet_rows').all_inner_texts()
+            if datalet_texts:
+                body_text = '\n'.join(datalet_texts)
             else:
-                result['error'] = 'No payment history found'
-                result['page_preview'] = body_text[:1000]
-
-            result['pin'] = pin
-            browser.close()
-            return result
+                body_text = page.locator('body').inner_text()
+                # Fall back to slicing between known anchor strings
+                start = body_text.find('Payment History')
+                if start != -1:
+                    end = body_text.find('Copyright', start + 1)
+                    body_text = body_text[start:end if end != -1 else len(body_text)]
 
         except Exception as e:
             page.screenshot(path='/tmp/nyc_tax_error.png')
             print(f"[NYC Tax] Error screenshot saved: /tmp/nyc_tax_error.png")
-            browser.close()
             result['error'] = str(e)
             return result
 
+    try:
+        return _finish_lookup(result, body_text, payments, pin)
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+
+
+def _finish_lookup(result: dict, body_text: str, payments: list | None, pin: str) -> dict:
+    """Shared parse tail for the sync and async lookups."""
+
+    # Extract address from header
+    addr_match = _ADDR_HEADER_RE.search(body_text)
+    if addr_match:
+        result['address'] = addr_match.group(1).strip()
+
+    # Parse payment history table when the structural pass found nothing
+    # (browser path, or markup the row walker did not recognize)
+    # Format: Credited Date | Activity Date | Amount | Year
+    if payments is None:
+        payments = []
+        for match in _PAYMENT_RE.findall(body_text):
+            credited_date, activity_date, amount_str, year = match
+            try:
+                amount = float(amount_str.replace(',', ''))
+                if amount > 0:
+                    payments.append({
+                        'credited_date': credited_date,
+                        'activity_date': activity_date,
+                        'amount': amount,
+                        'tax_year': int(year)
+                    })
+                    print(f"[NYC Tax] Payment: ${amount} for year {year} on {credited_date}")
+            except:
+                continue
+
+    # Group payments by tax year and track the most recent year inline —
+    # one pass instead of group + max() + re-index
+    by_year = defaultdict(lambda: {'total': 0.0, 'payments': []})
+    latest_year = -1
+    latest_total = 0.0
+    for payment in payments:
+        year = payment['tax_year']
+        slot = by_year[year]
+        slot['total'] += payment['amount']
+        slot['payments'].append(payment)
+        if year >= latest_year:
+            latest_year = year
+            latest_total = slot['total']
+
+    result['payments_by_year'] = dict(by_year)
+
+    # Get most recent year's total
+    if by_year:
+        result['tax_year'] = latest_year
+        result['tax_amount'] = latest_total
+        result['success'] = True
+        print(f"[NYC Tax] Latest year {latest_year}: ${result['tax_amount']:.2f}")
+    else:
+        result['error'] = 'No payment history found'
+        result['page_preview'] = body_text[:1000]
+
+    result['pin'] = pin
+    return result
+
+
+async def lookup_nyc_tax_async(boro: str, block: str, lot: str, browser, debug=False) -> dict:
+    """Async twin of lookup_nyc_tax for concurrent batch lookups.
+
+    Takes a browser from playwright.async_api so several lookups can share
+    one Chromium through separate contexts, e.g.
+    await asyncio.gather(lookup_nyc_tax_async(..., browser=b), ...).
+    """
+
+    pin = format_pin(boro, block, lot)
+    result = _result_skeleton(boro, block, lot, pin)
+    result['scraped_at'] = datetime.now().isoformat()
+
+    payment_url = f"{DATALET_URL}?mode=pa_pymts_hist&UseSearch=no&pin={pin}&jur=65&taxyr=2026&LMparent=20"
+
+    # Same fast path as the sync lookup, off the event loop
+    body_text = None
+    payments = None
+    try:
+        print(f"[NYC Tax] Fetching Payment History: {payment_url}...")
+        html = await asyncio.to_thread(_fetch_payment_history, payment_url)
+        if html is not None:
+            payments = _parse_payment_rows(html)
+            body_text = _visible_text(html)
+    except Exception as fetch_error:
+        print(f"[NYC Tax] Direct fetch failed ({fetch_error}); falling back to browser")
+
+    if body_text is None:
+        context = await browser.new_context(user_agent=USER_AGENT)
+        await context.route('**/*', _block_extras_async)
+        page = await context.new_page()
+        try:
+            print(f"[NYC Tax] Navigating to Payment History: {payment_url}...")
+            await page.goto(payment_url, timeout=60000, wait_until='domcontentloaded')
+            try:
+                await page.locator('table#Payment_History, table.datalet_section').first.wait_for(timeout=20000)
+            except Exception:
+                await page.wait_for_selector('text=/Payment History|Error/', timeout=5000)
+            if debug:
+                await page.screenshot(path='/tmp/nyc_tax_1_payments.png')
+
+            datalet_texts = await page.locator('#datalet_div, table.datalet_header, table.datalet_rows').all_inner_texts()
+            if datalet_texts:
+                body_text = '\n'.join(datalet_texts)
+            else:
+                body_text = await page.locator('body').inner_text()
+                start = body_text.find('Payment History')
+                if start != -1:
+                    end = body_text.find('Copyright', start + 1)
+                    body_text = body_text[start:end if end != -1 else len(body_text)]
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+        finally:
+            await context.close()
+
+    try:
+        return _finish_lookup(result, body_text, payments, pin)
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+
 
 def parse_nyc_bill(text: str, boro: str, block: str, lot: str, pin: str) -> dict:
     """Parse actual bill page for tax amounts."""
 
-    result = {
-        'success': False,
-        'boro': boro,
-        'block': block,
-        'lot': lot,
-        'pin': pin,
-        'borough_name': BOROUGHS.get(boro, 'Unknown'),
-    }
+    result = _result_skeleton(boro, block, lot, pin)
 
     # Look for address
-    addr_match = re.search(r'(\d+\s+[A-Z0-9\s#]+(?:STREET|ST|AVENUE|AVE|ROAD|RD)?[^,\n]*)', text, re.IGNORECASE)
+    addr_match = _BILL_ADDR_RE.search(text)
     if addr_match:
         result['address'] = addr_match.group(1).strip()
 
     # Look for "Amount Due" or similar
-    amount_patterns = [
-        r'Amount\s+Due[:\s]*\$?([\d,]+\.?\d*)',
-        r'Total\s+Due[:\s]*\$?([\d,]+\.?\d*)',
-        r'Current\s+Amount[:\s]*\$?([\d,]+\.?\d*)',
-        r'Tax\s+Amount[:\s]*\$?([\d,]+\.?\d*)',
-        r'Quarterly\s+Amount[:\s]*\$?([\d,]+\.?\d*)',
-        r'Balance[:\s]*\$?([\d,]+\.?\d*)',
-        r'\$\s*([\d,]+\.\d{2})',  # Generic dollar amount
-    ]
-
-    for pattern in amount_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            amount_str = match.group(1).replace(',', '')
-            try:
-                amount = float(amount_str)
-                # For 421-a properties, quarterly amounts should be very small (<$50)
-                if amount > 0 and amount < 5000:
-                    result['tax_amount'] = amount
-                    print(f"[NYC Tax] Found amount: ${amount}")
-                    break
-            except:
-                continue
+    # For 421-a properties, quarterly amounts should be very small (<$50)
+    amount = _pick_amount(_first_hits(_AMOUNT_RE, text), _AMOUNT_PRIORITY, 5000)
+    if amount is not None:
+        result['tax_amount'] = amount
+        print(f"[NYC Tax] Found amount: ${amount}")
 
     # Look for due date
-    due_patterns = [
-        r'Due\s+Date[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-        r'Due[:\s]*(\w+\s+\d{1,2},?\s+\d{4})',
-        r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-    ]
-
-    for pattern in due_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            result['due_date'] = match.group(1) if match.lastindex else match.group(0)
+    due_hits = _first_hits(_DUE_RE, text)
+    for group in _DUE_PRIORITY:
+        if group in due_hits:
+            result['due_date'] = due_hits[group]
             break
 
     # Look for quarter info
-    quarter_match = re.search(r'Q([1-4])|Quarter\s*([1-4])', text, re.IGNORECASE)
+    quarter_match = _QUARTER_RE.search(text)
     if quarter_match:
         result['quarter'] = int(quarter_match.group(1) or quarter_match.group(2))
 
     # Check for 421-a abatement
-    if '421' in text or 'abatement' in text.lower():
+    if _ABATEMENT_KW_RE.search(text):
         result['has_abatement'] = True
         result['abatement_type'] = '421-a'
 
@@ -222,89 +585,52 @@ def parse_nyc_bill(text: str, boro: str, block: str, lot: str, pin: str) -> dict
 def parse_nyc_results(text: str, boro: str, block: str, lot: str) -> dict:
     """Parse tax information from NYC portal results."""
 
-    result = {
-        'success': False,
-        'boro': boro,
-        'block': block,
-        'lot': lot,
-        'borough_name': BOROUGHS.get(boro, 'Unknown'),
-    }
+    result = _result_skeleton(boro, block, lot)
 
     # Look for address
-    addr_patterns = [
-        r'(\d+\s+[A-Z\s]+(?:STREET|ST|AVENUE|AVE|ROAD|RD|PLACE|PL|DRIVE|DR))',
-        r'Address[:\s]+([^\n]+)',
-    ]
-    for pattern in addr_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            result['address'] = match.group(1).strip()
+    addr_hits = _first_hits(_RESULT_ADDR_RE, text)
+    for group in _RESULT_ADDR_PRIORITY:
+        if group in addr_hits:
+            result['address'] = addr_hits[group].strip()
             break
 
     # Look for owner
-    owner_match = re.search(r'Owner[:\s]+([^\n]+)', text, re.IGNORECASE)
+    owner_match = _OWNER_RE.search(text)
     if owner_match:
         result['owner'] = owner_match.group(1).strip()
 
-    # Look for tax amounts - various patterns
-    tax_patterns = [
-        r'Tax\s+Amount[:\s]*\$?([\d,]+\.?\d*)',
-        r'Annual\s+Tax[:\s]*\$?([\d,]+\.?\d*)',
-        r'Property\s+Tax[:\s]*\$?([\d,]+\.?\d*)',
-        r'Total\s+Tax[:\s]*\$?([\d,]+\.?\d*)',
-        r'Amount\s+Due[:\s]*\$?([\d,]+\.?\d*)',
-        r'Current\s+Amount[:\s]*\$?([\d,]+\.?\d*)',
-        r'Quarterly\s+Amount[:\s]*\$?([\d,]+\.?\d*)',
-        r'\$\s*([\d,]+\.\d{2})',  # Generic dollar amount
-    ]
-
-    for pattern in tax_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            amount_str = match.group(1).replace(',', '')
-            try:
-                amount = float(amount_str)
-                if amount > 0 and amount < 100000:  # Sanity check
-                    result['tax_amount'] = amount
-                    break
-            except:
-                continue
+    # Look for tax amounts - various patterns (100k sanity cap)
+    amount = _pick_amount(_first_hits(_TAX_RE, text), _TAX_PRIORITY, 100000)
+    if amount is not None:
+        result['tax_amount'] = amount
 
     # Look for abatement info
-    if '421' in text or 'abatement' in text.lower():
+    if _ABATEMENT_KW_RE.search(text):
         result['has_abatement'] = True
-        abatement_match = re.search(r'421[-\s]?[aA]', text)
+        abatement_match = _ABATEMENT_RE.search(text)
         if abatement_match:
             result['abatement_type'] = '421-a'
 
     # Look for assessed value
-    assessed_patterns = [
-        r'Assessed\s+Value[:\s]*\$?([\d,]+)',
-        r'Assessment[:\s]*\$?([\d,]+)',
-    ]
-    for pattern in assessed_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _ASSESSED_PATTERNS:
+        match = pattern.search(text)
         if match:
             result['assessed_value'] = float(match.group(1).replace(',', ''))
             break
 
     # Look for market value
-    market_patterns = [
-        r'Market\s+Value[:\s]*\$?([\d,]+)',
-        r'Full\s+Value[:\s]*\$?([\d,]+)',
-    ]
-    for pattern in market_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _MARKET_PATTERNS:
+        match = pattern.search(text)
         if match:
             result['market_value'] = float(match.group(1).replace(',', ''))
             break
 
     # Look for tax year
-    year_match = re.search(r'(202[4-9])[/-](202[5-9])', text)
+    year_match = _YEAR_RANGE_RE.search(text)
     if year_match:
         result['tax_year'] = int(year_match.group(2))
     else:
-        year_match = re.search(r'FY\s*(202[5-9])', text, re.IGNORECASE)
+        year_match = _FY_RE.search(text)
         if year_match:
             result['tax_year'] = int(year_match.group(1))
 
@@ -324,9 +650,10 @@ def main():
     parser.add_argument('--block', required=True, help='Block number')
     parser.add_argument('--lot', required=True, help='Lot number')
     parser.add_argument('--json', action='store_true', help='Output as JSON only')
+    parser.add_argument('--debug', action='store_true', help='Save screenshots and page HTML to /tmp')
     args = parser.parse_args()
 
-    result = lookup_nyc_tax(args.boro, args.block, args.lot)
+    result = lookup_nyc_tax(args.boro, args.block, args.lot, debug=args.debug)
 
     if args.json:
         print(json.dumps(result, indent=2))
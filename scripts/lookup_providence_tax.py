@@ -13,109 +13,250 @@ import sys
 import json
 import re
 import argparse
+import asyncio
 from datetime import datetime
 
 sys.path.insert(0, '/Users/toddhome/Library/Python/3.12/lib/python/site-packages')
 
+import requests
 from playwright.sync_api import sync_playwright
+import atexit
 import time
 
 DEFAULT_ADDRESS = "88 Williams"
 SITE_URL = "https://epay.cityhallsystems.com"
 
+# Compiled once at import; the parser runs per scraped page and skips the
+# re module's per-call cache lookup.
+_PARCEL_RE = re.compile(r'(\d{3}-\d{4}-\d{4})')
+_ADDR_RE = re.compile(r'(\d{3}-\d{4}-\d{4})\s+(.+?(?:ST|AVE|RD|DR|LN|CT|PL|WAY)),?\s*PROVIDENCE', re.IGNORECASE)
+_OWNER_RE = re.compile(r'(\d{4})\s+\d+\s+([A-Z][A-Z\s]+)\s+\d{3}-\d{4}')
+# Fallback owner: an all-caps line adjacent to a line containing a digit
+_OWNER_FALLBACK_RE = re.compile(
+    r'^[^\n]*\d[^\n]*\n(?P<after>[A-Z][A-Z\s]{4,})$'
+    r'|^(?P<before>[A-Z][A-Z\s]{4,})\n[^\n]*\d',
+    re.MULTILINE)
+_DUE_RE = re.compile(r'Due\s+(\d{2}/\d{2}/\d{4}):\s*\$\s*([\d,]+\.\d{2})')
+_BALANCE_RE = re.compile(r'Full Balance:\s*\$\s*([\d,]+\.\d{2})')
+_YEAR_RE = re.compile(r'\b(202[4-9])\b.*TAX')
+
+
+# One session for callback POSTs — keeps the TCP+TLS connection alive
+# across properties instead of a fresh handshake per result
+_HTTP = requests.Session()
+_HTTP.headers['Content-Type'] = 'application/json'
+atexit.register(_HTTP.close)
+
+
+# Resources the parsers never read; Chromium would still download and
+# decode them. CSS is kept — the visibility waits depend on layout.
+_BLOCKED_RESOURCES = frozenset({'image', 'font', 'media'})
+_BLOCKED_HOSTS = ('google-analytics', 'googletagmanager', 'doubleclick', 'hotjar')
+
+
+def _block_extras(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCES or any(h in request.url for h in _BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+async def _block_extras_async(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCES or any(h in request.url for h in _BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# One Chromium instance shared across lookups — launching the browser is the
+# dominant fixed cost of a batch run. The profile dir persists cookies and
+# the HTTP cache across runs, so repeat lookups skip re-downloading the
+# site's static JS/CSS.
+_PROFILE_DIR = '/tmp/providence_chs_profile'
+_PW = None
+_CONTEXT = None
+
+
+def _shutdown_browser():
+    global _PW, _CONTEXT
+    if _CONTEXT is not None:
+        _CONTEXT.close()
+        _CONTEXT = None
+    if _PW is not None:
+        _PW.stop()
+        _PW = None
+
+
+def _get_context():
+    """Lazily start the shared headless Chromium with a persistent profile."""
+    global _PW, _CONTEXT
+    if _CONTEXT is None:
+        _PW = sync_playwright().start()
+        _CONTEXT = _PW.chromium.launch_persistent_context(
+            user_data_dir=_PROFILE_DIR,
+            headless=True,
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        )
+        _CONTEXT.route('**/*', _block_extras)
+        atexit.register(_shutdown_browser)
+    return _CONTEXT
+
 
-def lookup_providence_tax(address: str = DEFAULT_ADDRESS) -> dict:
+def lookup_providence_tax(address: str = DEFAULT_ADDRESS, context=None, debug=False) -> dict:
     """Look up Providence RI property tax via City Hall Systems."""
 
+    scraped_at = datetime.now().isoformat()
     result = {
         'success': False,
         'address': address,
         'municipality': 'Providence, RI',
-        'scraped_at': datetime.now().isoformat()
+        'scraped_at': scraped_at
     }
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        )
-        page = context.new_page()
-
-        try:
-            print(f"[Providence Tax] Navigating to {SITE_URL}...")
-            page.goto(SITE_URL, timeout=60000)
-            time.sleep(2)
-
-            # Select Providence, RI from municipality dropdown
-            print("[Providence Tax] Selecting Providence, RI...")
-            muni_input = page.locator('input[type="text"]').nth(1)
-            muni_input.fill('Providence RI')
-            time.sleep(1)
-            muni_input.press('ArrowDown')
-            muni_input.press('Enter')
-            time.sleep(3)
-
-            # Click View/Pay bills
-            print("[Providence Tax] Clicking View/Pay bills...")
-            btn = page.locator('button:has-text("View/Pay bills")').first
-            btn.click()
-            time.sleep(3)
-
-            # Select Real Estate bill type
-            print("[Providence Tax] Selecting Real Estate...")
-            page.evaluate('selectionTypes("re")')
-            time.sleep(3)
-
-            # Search for address
-            print(f"[Providence Tax] Searching for: {address}")
-            search_input = page.locator('#form_for')
-            search_input.fill(address)
-            search_btn = page.locator('button:has-text("Search Bill")').first
-            search_btn.click()
-            time.sleep(3)
-
-            # Get results page text
-            body_text = page.locator('body').inner_text()
-
-            # Parse results
-            result = parse_providence_results(body_text, address)
-            result['scraped_at'] = datetime.now().isoformat()
+    if context is None:
+        context = _get_context()
+    # Reuse the restored tab so session state survives between lookups
+    page = context.pages[0] if context.pages else context.new_page()
 
+    try:
+        print(f"[Providence Tax] Navigating to {SITE_URL}...")
+        page.goto(SITE_URL, timeout=60000)
+        page.wait_for_selector('input[type="text"]', state='visible')
+
+        # Select Providence, RI from municipality dropdown
+        print("[Providence Tax] Selecting Providence, RI...")
+        muni_input = page.locator('input[type="text"]').nth(1)
+        muni_input.fill('Providence RI')
+        time.sleep(1)
+        muni_input.press('ArrowDown')
+        muni_input.press('Enter')
+        page.wait_for_selector('button:has-text("View/Pay bills")', state='visible')
+
+        # Click View/Pay bills
+        print("[Providence Tax] Clicking View/Pay bills...")
+        btn = page.locator('button:has-text("View/Pay bills")').first
+        btn.click()
+        page.wait_for_selector('[onclick*="selectionTypes"]', state='attached')
+
+        # Select Real Estate bill type
+        print("[Providence Tax] Selecting Real Estate...")
+        page.evaluate('selectionTypes("re")')
+        page.wait_for_selector('#form_for', state='visible')
+
+        # Search for address
+        print(f"[Providence Tax] Searching for: {address}")
+        search_input = page.locator('#form_for')
+        search_input.fill(address)
+        search_btn = page.locator('button:has-text("Search Bill")').first
+        search_btn.click()
+        page.wait_for_selector('text=Due', timeout=15000)
+
+        # Get results page text
+        body_text = page.locator('body').inner_text()
+
+        # Parse results
+        result = parse_providence_results(body_text, address)
+        result['scraped_at'] = scraped_at
+
+        # Screenshotting forces a full paint + PNG encode; debug only
+        if debug:
             page.screenshot(path='/tmp/providence_tax_result.png')
             print("[Providence Tax] Screenshot saved to /tmp/providence_tax_result.png")
 
-            # Try to download the PDF bill
-            try:
-                pdf_link = page.locator('a:has-text("click here to view your bill")').first
-                if pdf_link.count() > 0:
-                    print("[Providence Tax] Found PDF link, downloading...")
-                    with page.expect_download() as download_info:
-                        pdf_link.click()
-                    download = download_info.value
-                    pdf_path = '/tmp/providence_tax_bill.pdf'
-                    download.save_as(pdf_path)
-                    result['pdf_downloaded'] = True
-                    result['pdf_path'] = pdf_path
-                    print(f"[Providence Tax] PDF saved to {pdf_path}")
-            except Exception as pdf_error:
-                print(f"[Providence Tax] Could not download PDF: {pdf_error}")
-
-            browser.close()
-            return result
-
-        except Exception as e:
-            page.screenshot(path='/tmp/providence_tax_error.png')
-            browser.close()
-            result['error'] = str(e)
-            return result
+        # Try to download the PDF bill
+        try:
+            pdf_link = page.locator('a:has-text("click here to view your bill")').first
+            if pdf_link.count() > 0:
+                print("[Providence Tax] Found PDF link, downloading...")
+                with page.expect_download() as download_info:
+                    pdf_link.click()
+                download = download_info.value
+                pdf_path = '/tmp/providence_tax_bill.pdf'
+                download.save_as(pdf_path)
+                result['pdf_downloaded'] = True
+                result['pdf_path'] = pdf_path
+                print(f"[Providence Tax] PDF saved to {pdf_path}")
+        except Exception as pdf_error:
+            print(f"[Providence Tax] Could not download PDF: {pdf_error}")
+
+        return result
+
+    except Exception as e:
+        page.screenshot(path='/tmp/providence_tax_error.png')
+        result['error'] = str(e)
+        return result
+
+
+async def lookup_providence_tax_async(address: str = DEFAULT_ADDRESS, browser=None, debug=False) -> dict:
+    """Async twin of lookup_providence_tax for concurrent batch lookups.
+
+    Takes a browser from playwright.async_api so a driver can run this
+    alongside the NYC lookup on one Chromium via separate contexts, e.g.
+    await asyncio.gather(lookup_providence_tax_async(..., browser=b), ...).
+    """
+
+    scraped_at = datetime.now().isoformat()
+    result = {
+        'success': False,
+        'address': address,
+        'municipality': 'Providence, RI',
+        'scraped_at': scraped_at
+    }
+
+    context = await browser.new_context(
+        user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+    )
+    await context.route('**/*', _block_extras_async)
+    page = await context.new_page()
+
+    try:
+        print(f"[Providence Tax] Navigating to {SITE_URL}...")
+        await page.goto(SITE_URL, timeout=60000)
+        await page.wait_for_selector('input[type="text"]', state='visible')
+
+        print("[Providence Tax] Selecting Providence, RI...")
+        muni_input = page.locator('input[type="text"]').nth(1)
+        await muni_input.fill('Providence RI')
+        await asyncio.sleep(1)
+        await muni_input.press('ArrowDown')
+        await muni_input.press('Enter')
+        await page.wait_for_selector('button:has-text("View/Pay bills")', state='visible')
+
+        print("[Providence Tax] Clicking View/Pay bills...")
+        await page.locator('button:has-text("View/Pay bills")').first.click()
+        await page.wait_for_selector('[onclick*="selectionTypes"]', state='attached')
+
+        print("[Providence Tax] Selecting Real Estate...")
+        await page.evaluate('selectionTypes("re")')
+        await page.wait_for_selector('#form_for', state='visible')
+
+        print(f"[Providence Tax] Searching for: {address}")
+        await page.locator('#form_for').fill(address)
+        await page.locator('button:has-text("Search Bill")').first.click()
+        await page.wait_for_selector('text=Due', timeout=15000)
+
+        body_text = await page.locator('body').inner_text()
+        result = parse_providence_results(body_text, address)
+        result['scraped_at'] = scraped_at
+
+        if debug:
+            await page.screenshot(path='/tmp/providence_tax_result.png')
+
+        return result
+
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+
+    finally:
+        await context.close()
 
 
 def parse_providence_results(text: str, search_address: str) -> dict:
     """Parse tax information from City Hall Systems results page."""
 
-    lines = text.split('\n')
-    lines = [l.strip() for l in lines if l.strip()]
-
     result = {
         'success': False,
         'address': search_address,
@@ -123,41 +264,40 @@ def parse_providence_results(text: str, search_address: str) -> dict:
     }
 
     # Look for parcel number pattern: XXX-XXXX-XXXX
-    parcel_match = re.search(r'(\d{3}-\d{4}-\d{4})', text)
+    parcel_match = _PARCEL_RE.search(text)
     if parcel_match:
         result['parcel_number'] = parcel_match.group(1)
 
     # Look for address in results
-    addr_match = re.search(r'(\d{3}-\d{4}-\d{4})\s+(.+?(?:ST|AVE|RD|DR|LN|CT|PL|WAY)),?\s*PROVIDENCE', text, re.IGNORECASE)
+    addr_match = _ADDR_RE.search(text)
     if addr_match:
         result['full_address'] = addr_match.group(2).strip() + ', Providence'
 
     # Look for owner name (usually after parcel on same line or line before address)
-    owner_match = re.search(r'(\d{4})\s+\d+\s+([A-Z][A-Z\s]+)\s+\d{3}-\d{4}', text)
+    owner_match = _OWNER_RE.search(text)
     if owner_match:
         result['owner'] = owner_match.group(2).strip()
     else:
-        # Try another pattern
-        for i, line in enumerate(lines):
-            if 'SPALTER' in line.upper() or re.match(r'^[A-Z\s]+$', line) and len(line) > 5:
-                if any(c.isdigit() for c in lines[i-1] if i > 0) or any(c.isdigit() for c in lines[i+1] if i < len(lines)-1):
-                    result['owner'] = line.strip()
-                    break
+        # Try another pattern — one pre-compiled search instead of
+        # materializing a stripped line list and probing neighbours per line
+        fallback = _OWNER_FALLBACK_RE.search(text)
+        if fallback:
+            result['owner'] = (fallback.group('after') or fallback.group('before')).strip()
 
     # Look for due date and amount patterns
     # Pattern: "Due MM/DD/YYYY: $ X,XXX.XX"
-    due_matches = re.findall(r'Due\s+(\d{2}/\d{2}/\d{4}):\s*\$\s*([\d,]+\.\d{2})', text)
+    due_matches = _DUE_RE.findall(text)
     if due_matches:
         result['next_due_date'] = due_matches[0][0]
         result['next_due_amount'] = float(due_matches[0][1].replace(',', ''))
 
     # Look for full balance (remaining balance, not annual)
-    balance_match = re.search(r'Full Balance:\s*\$\s*([\d,]+\.\d{2})', text)
+    balance_match = _BALANCE_RE.search(text)
     if balance_match:
         result['remaining_balance'] = float(balance_match.group(1).replace(',', ''))
 
     # Look for year
-    year_match = re.search(r'\b(202[4-9])\b.*TAX', text)
+    year_match = _YEAR_RE.search(text)
     if year_match:
         result['tax_year'] = int(year_match.group(1))
     else:
@@ -187,10 +327,8 @@ def parse_providence_results(text: str, search_address: str) -> dict:
     return result
 
 
-def post_to_callback(url: str, data: dict) -> bool:
-    """Post results to callback URL."""
-    import urllib.request
-
+def callback_payload(data: dict) -> dict:
+    """Build the callback payload for one lookup result."""
     # Format installments for the callback
     installments = []
     for inst in data.get('installments', []):
@@ -201,7 +339,7 @@ def post_to_callback(url: str, data: dict) -> bool:
             'status': inst.get('status', 'unknown')
         })
 
-    payload = json.dumps({
+    return {
         'provider': 'city_hall_systems',
         'property_id': None,  # Will be matched by parcel number or address
         'parcel_number': data.get('parcel_number'),
@@ -215,33 +353,40 @@ def post_to_callback(url: str, data: dict) -> bool:
         'success': data.get('success', False),
         'error': data.get('error'),
         'raw_data': data
-    }).encode('utf-8')
+    }
 
-    req = urllib.request.Request(
-        url,
-        data=payload,
-        headers={'Content-Type': 'application/json'}
-    )
+
+def post_to_callback(url: str, data: dict) -> bool:
+    """Post results to callback URL."""
+    payload = json.dumps(callback_payload(data)).encode('utf-8')
 
     try:
-        with urllib.request.urlopen(req) as response:
-            print(f"[Providence Tax] Callback response: {response.status}")
-            resp_body = response.read().decode('utf-8')
-            print(f"[Providence Tax] Response: {resp_body}")
-            return response.status == 200
+        response = _HTTP.post(url, data=payload, timeout=30)
+        print(f"[Providence Tax] Callback response: {response.status_code}")
+        print(f"[Providence Tax] Response: {response.text}")
+        return response.status_code == 200
     except Exception as e:
         print(f"[Providence Tax] Callback failed: {e}")
         return False
 
 
+def lookup(address: str = DEFAULT_ADDRESS, callback_url: str = None) -> dict:
+    """In-process entry point used by sync_all_taxes.py"""
+    result = lookup_providence_tax(address)
+    if callback_url:
+        post_to_callback(callback_url, result)
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(description='Providence RI Property Tax Lookup')
     parser.add_argument('--address', default=DEFAULT_ADDRESS, help='Property address to search')
     parser.add_argument('--json', action='store_true', help='Output as JSON only')
     parser.add_argument('--callback', help='URL to POST results to')
+    parser.add_argument('--debug', action='store_true', help='Save screenshots to /tmp')
     args = parser.parse_args()
 
-    result = lookup_providence_tax(args.address)
+    result = lookup_providence_tax(args.address, debug=args.debug)
 
     if args.json:
         print(json.dumps(result, indent=2))
@@ -12,13 +12,16 @@ Looks up property tax for Vermont properties.
 """
 import sys
 import json
+import os
 import re
 import argparse
+import asyncio
 from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urljoin
 
-sys.path.insert(0, '/Users/toddhome/Library/Python/3.12/lib/python/site-packages')
-
-from playwright.sync_api import sync_playwright
+import requests
+import atexit
 import time
 
 # Vermont towns and their database URLs
@@ -39,10 +42,297 @@ VERMONT_DATABASES = {
 DEFAULT_TOWN = 'dummerston'
 DEFAULT_ADDRESS = '2055 Sunset Lake'
 
+# One fused alternation; a single finditer pass over the detail text
+# replaces eight separate full-text scans. The owner class is bounded to
+# one line so a greedy match can't swallow the next field's label.
+_NEMRC_RE = re.compile(
+    r'SPAN[:\s]+(?P<span>\d{3}-\d{3}-\d{5})'
+    r'|(?i:Parcel ID)[:\s]+(?P<parcel>[A-Z0-9\-]+)'
+    r'|Owner[:\s]+(?P<owner>[A-Z][A-Z ,\.]+)'
+    r'|(?i:Location)[:\s]+(?P<location>.+?)(?:\n|$)'
+    r'|Land[:\s]+\$?(?P<land>[\d,]+)'
+    r'|Building[s]?[:\s]+\$?(?P<building>[\d,]+)'
+    r'|Total[:\s]+\$?(?P<total>[\d,]+)'
+    r'|Tax[:\s]+\$?(?P<tax>[\d,]+\.?\d*)'
+)
+
+
+_STRIP_MONEY = str.maketrans('', '', ',$')
+
+
+def _money(value: str) -> float:
+    # translate with a precomputed table beats chained .replace calls;
+    # float is kept so result types stay stable for the callback payload
+    return float(value.translate(_STRIP_MONEY))
+
+
+# Match group -> (result key, value transform)
+_NEMRC_FIELDS = {
+    'span': ('span_number', str),
+    'parcel': ('parcel_id', str),
+    'owner': ('owner', str.strip),
+    'location': ('full_address', str.strip),
+    'land': ('land_value', _money),
+    'building': ('building_value', _money),
+    'total': ('total_assessed_value', _money),
+    'tax': ('annual_tax', _money),
+}
+
+_VALUE_RE = re.compile(r'(?:Total|Assessed|Value)[:\s]*\$?([\d,]+)')
+
+# Resources the parsers never read; AxisGIS especially is map-tile heavy.
+# CSS stays loaded — the visibility waits depend on layout.
+_BLOCKED_RESOURCES = frozenset({'image', 'font', 'media'})
+_BLOCKED_HOSTS = ('google-analytics', 'googletagmanager', 'doubleclick', 'hotjar')
+
+
+def _block_extras(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCES or any(h in request.url for h in _BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+class _TextExtractor(HTMLParser):
+    """Minimal visible-text extractor; enough for the line parsers."""
+
+    _SKIP = frozenset({'script', 'style'})
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            data = data.strip()
+            if data:
+                self._chunks.append(data)
+
+    def text(self) -> str:
+        return '\n'.join(self._chunks)
+
+
+def _flatten_html(html: str) -> str:
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    return extractor.text()
+
+
+class _FormExtractor(HTMLParser):
+    """Collect the first form's action and its inputs, in document order."""
+
+    def __init__(self):
+        super().__init__()
+        self.action = None
+        self.inputs = []
+        self._in_form = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form' and self.action is None:
+            self.action = attrs.get('action', '')
+            self._in_form = True
+        elif tag == 'input' and self._in_form:
+            self.inputs.append(attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._in_form = False
+
+
+class _RowLinkExtractor(HTMLParser):
+    """Collect (row_text, [hrefs]) per table row from results HTML."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._chunks = None
+        self._hrefs = None
 
-def lookup_dummerston_tax(address: str = DEFAULT_ADDRESS) -> dict:
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._chunks, self._hrefs = [], []
+        elif tag == 'a' and self._hrefs is not None:
+            href = dict(attrs).get('href')
+            if href:
+                self._hrefs.append(href)
+
+    def handle_endtag(self, tag):
+        if tag == 'tr' and self._chunks is not None:
+            self.rows.append((' '.join(self._chunks), self._hrefs))
+            self._chunks = self._hrefs = None
+
+    def handle_data(self, data):
+        if self._chunks is not None:
+            data = data.strip()
+            if data:
+                self._chunks.append(data)
+
+
+_HTTP = requests.Session()
+_HTTP.headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+# Sized so concurrent callback posts each get a pooled connection
+for _scheme in ('http://', 'https://'):
+    _HTTP.mount(_scheme, requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# One persistent context per site, launched lazily and kept for the
+# process lifetime. The on-disk profile carries DNS/HTTP caches and HSTS
+# state across invocations, so repeat runs skip cold-start fetches.
+_PW = None
+_CONTEXTS = {}
+
+_LAUNCH_ARGS = ['--disable-gpu', '--disable-dev-shm-usage', '--no-sandbox',
+                '--blink-settings=imagesEnabled=false']
+_PROFILE_ROOT = os.path.expanduser('~/.cache/vt_tax_pw')
+
+
+def _shutdown_browser():
+    global _PW
+    for context in _CONTEXTS.values():
+        context.close()
+    _CONTEXTS.clear()
+    if _PW is not None:
+        _PW.stop()
+        _PW = None
+
+
+# Tax data changes at most a few times a year; a short-lived disk cache
+# lets repeat runs skip the network entirely.
+_CACHE_DIR = os.path.expanduser('~/.cache/vt_tax')
+_CACHE_TTL_HOURS = 24
+_WS_RE = re.compile(r'\s+')
+
+
+def _cache_path(town: str, key: str) -> str:
+    slug = _WS_RE.sub('_', key.strip().lower()).replace('/', '_')
+    return os.path.join(_CACHE_DIR, f'{town}_{slug}.json')
+
+
+def _read_cache(path: str, ttl_hours: float = _CACHE_TTL_HOURS):
+    try:
+        if time.time() - os.stat(path).st_mtime > ttl_hours * 3600:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path: str, result: dict):
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(result, f)
+    except OSError:
+        pass
+
+
+_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+# NEMRC is a server-rendered PHP form: no page JS to run, and a small
+# viewport keeps layout cheap. page.evaluate still works with JS off.
+_NEMRC_CTX = {'user_agent': _USER_AGENT, 'java_script_enabled': False,
+              'viewport': {'width': 800, 'height': 600}}
+# AxisGIS needs its Esri scripts; a modest 1x viewport caps how many map
+# requests the app even attempts before the route blocker drops them.
+_AXISGIS_CTX = {'user_agent': _USER_AGENT, 'device_scale_factor': 1,
+                'viewport': {'width': 1024, 'height': 768}}
+
+
+def _get_context(site: str):
+    global _PW
+    context = _CONTEXTS.get(site)
+    if context is None:
+        if _PW is None:
+            # Deferred: playwright's import costs hundreds of ms, which
+            # --help and the plain-HTTP fast path should not pay
+            from playwright.sync_api import sync_playwright
+            _PW = sync_playwright().start()
+            atexit.register(_shutdown_browser)
+        kwargs = _NEMRC_CTX if site == 'dummerston' else _AXISGIS_CTX
+        context = _PW.chromium.launch_persistent_context(
+            user_data_dir=os.path.join(_PROFILE_ROOT, site),
+            headless=True, args=_LAUNCH_ARGS, **kwargs)
+        context.route('**/*', _block_extras)
+        _CONTEXTS[site] = context
+    return context
+
+
+def _fetch_nemrc_detail(address: str):
+    """Fetch the NEMRC detail page over plain HTTP; None if the shape is off.
+
+    searchT.php is a classic PHP form with no JS requirement, so a
+    requests round-trip replaces a full Chromium launch on the happy path.
+    """
+    url = VERMONT_DATABASES['dummerston']['url']
+    resp = _HTTP.get(url, timeout=30)
+    resp.raise_for_status()
+
+    form = _FormExtractor()
+    form.feed(resp.text)
+    text_fields = [a for a in form.inputs if a.get('type', 'text') == 'text']
+    if len(text_fields) < 4:
+        return None
+
+    addr_parts = address.split(' ', 1)
+    street_num = addr_parts[0] if addr_parts[0].isdigit() else ''
+    street_name = addr_parts[1] if len(addr_parts) > 1 else address
+
+    # Hidden fields carry session/CSRF state; text fields match the
+    # browser path's positional order (parcel, owner, street #, street)
+    payload = {a['name']: a.get('value', '') for a in form.inputs
+               if a.get('type') == 'hidden' and a.get('name')}
+    if text_fields[2].get('name'):
+        payload[text_fields[2]['name']] = street_num
+    if text_fields[3].get('name'):
+        payload[text_fields[3]['name']] = street_name
+
+    action = urljoin(url, form.action or url)
+    resp = _HTTP.post(action, data=payload, timeout=30)
+    resp.raise_for_status()
+
+    rows = _RowLinkExtractor()
+    rows.feed(resp.text)
+    detail_href = None
+    name_prefix = street_name.upper()[:6]  # hoisted out of the row loop
+    for row_text, hrefs in rows.rows:
+        if not hrefs:
+            continue
+        if street_num and street_num in row_text and name_prefix in row_text.upper():
+            detail_href = hrefs[0]
+            break
+        if detail_href is None:
+            detail_href = hrefs[0]
+    if detail_href is None:
+        return None
+
+    resp = _HTTP.get(urljoin(action, detail_href), timeout=30)
+    resp.raise_for_status()
+    detail_text = _flatten_html(resp.text)
+    return detail_text if 'SPAN' in detail_text else None
+
+
+def lookup_dummerston_tax(address: str = DEFAULT_ADDRESS, debug: bool = False,
+                          use_cache: bool = True) -> dict:
     """Look up Dummerston VT property tax via NEMRC database."""
 
+    cache_path = _cache_path('dummerston', address)
+    if use_cache:
+        cached = _read_cache(cache_path)
+        if cached is not None:
+            print(f"[VT Tax] Using cached result from {cache_path}")
+            return cached
+
     result = {
         'success': False,
         'address': address,
@@ -50,158 +340,175 @@ def lookup_dummerston_tax(address: str = DEFAULT_ADDRESS) -> dict:
         'scraped_at': datetime.now().isoformat()
     }
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        )
-        page = context.new_page()
-
-        try:
-            url = VERMONT_DATABASES['dummerston']['url']
-            print(f"[VT Tax] Navigating to {url}...")
-            page.goto(url, timeout=60000)
-            time.sleep(2)
-
-            # Parse address into number and street name
-            addr_parts = address.split(' ', 1)
-            street_num = addr_parts[0] if addr_parts[0].isdigit() else ''
-            street_name = addr_parts[1] if len(addr_parts) > 1 else address
-
-            # Fill search form - look for form inputs
-            print(f"[VT Tax] Searching for: {address}")
-
-            # Get all text inputs on the page
-            inputs = page.locator('input[type="text"]')
-            input_count = inputs.count()
-            print(f"[VT Tax] Found {input_count} text inputs")
-
-            # Fill in street number (usually first or second field after parcel)
-            if street_num and input_count >= 3:
-                # Field order: Parcel ID, Owner Name, Parcel Street #, Street Name
-                num_input = inputs.nth(2)  # Third field is usually street number
-                num_input.fill(street_num)
-
-            if input_count >= 4:
-                # Fourth field is street name
-                name_input = inputs.nth(3)
-                name_input.fill(street_name)
-
-            # Submit search
-            submit_btn = page.locator('input[type="submit"], button[type="submit"]').first
-            submit_btn.click()
-            time.sleep(3)
+    # Plain-HTTP fast path; the browser below is only a fallback for the
+    # day NEMRC grows a JS challenge
+    try:
+        detail_text = _fetch_nemrc_detail(address)
+    except Exception as e:
+        print(f"[VT Tax] HTTP path failed ({e}); falling back to browser")
+        detail_text = None
+    if detail_text is not None:
+        result = parse_nemrc_property(detail_text, address)
+        result['scraped_at'] = datetime.now().isoformat()
+        if result.get('success'):
+            _write_cache(cache_path, result)
+        return result
+
+    context = _get_context('dummerston')
+    page = context.new_page()
 
+    try:
+        url = VERMONT_DATABASES['dummerston']['url']
+        print(f"[VT Tax] Navigating to {url}...")
+        page.goto(url, timeout=60000)
+        page.wait_for_selector('input[type="text"]', timeout=15000)
+
+        # Parse address into number and street name
+        addr_parts = address.split(' ', 1)
+        street_num = addr_parts[0] if addr_parts[0].isdigit() else ''
+        street_name = addr_parts[1] if len(addr_parts) > 1 else address
+
+        # Fill search form - look for form inputs
+        print(f"[VT Tax] Searching for: {address}")
+
+        # Get all text inputs on the page
+        inputs = page.locator('input[type="text"]')
+        input_count = inputs.count()
+        print(f"[VT Tax] Found {input_count} text inputs")
+
+        # Fill in street number (usually first or second field after parcel)
+        if street_num and input_count >= 3:
+            # Field order: Parcel ID, Owner Name, Parcel Street #, Street Name
+            num_input = inputs.nth(2)  # Third field is usually street number
+            num_input.fill(street_num)
+
+        if input_count >= 4:
+            # Fourth field is street name
+            name_input = inputs.nth(3)
+            name_input.fill(street_name)
+
+        # Submit search
+        submit_btn = page.locator('input[type="submit"], button[type="submit"]').first
+        submit_btn.click()
+        # Results render as a table of detail links; wait for those
+        # instead of a fixed pause
+        page.wait_for_selector('tr a', timeout=10000)
+
+        # PNG encode + disk write cost ~0.5s; debug only
+        if debug:
             page.screenshot(path='/tmp/vermont_tax_search.png')
             print("[VT Tax] Search results screenshot saved to /tmp/vermont_tax_search.png")
 
-            # Get results page
-            body_text = page.locator('body').inner_text()
-
-            # Look for the specific property row in results table
-            # Find rows that contain our street number
-            rows = page.locator('tr')
-            target_row = None
-
-            for i in range(rows.count()):
-                row_text = rows.nth(i).inner_text()
-                # Look for the specific street number
-                if street_num and street_num in row_text and street_name.upper()[:6] in row_text.upper():
-                    print(f"[VT Tax] Found matching row: {row_text[:80]}...")
-                    target_row = rows.nth(i)
-                    break
-
-            # Find and click the View Detail link
-            if target_row:
-                detail_link = target_row.locator('a').first
-                if detail_link.count() > 0:
-                    detail_link.click()
-                    time.sleep(2)
-                else:
-                    print("[VT Tax] No link in matching row, trying first View Detail link")
-                    page.locator('a:has-text("View Detail")').first.click()
-                    time.sleep(2)
+        # The results listing sometimes already carries the fields we
+        # need; parse it first and skip the detail fetch when it does
+        listing = parse_nemrc_property(_flatten_html(page.content()), address)
+        if listing.get('span_number') or listing.get('total_assessed_value'):
+            print("[VT Tax] Results listing was sufficient; skipping detail page")
+            listing['scraped_at'] = datetime.now().isoformat()
+            if listing.get('success'):
+                _write_cache(cache_path, listing)
+            page.close()
+            return listing
+
+        # Look for the specific property row in results table — one
+        # evaluate call instead of a CDP round-trip per row
+        matches = page.evaluate(
+            '''([num, prefix]) => [...document.querySelectorAll('tr')]
+                .map(r => ({text: r.innerText, href: r.querySelector('a')?.href}))
+                .filter(r => r.href && num && r.text.includes(num)
+                    && r.text.toUpperCase().includes(prefix))''',
+            [street_num, street_name.upper()[:6]])
+
+        detail_text = None
+        if matches:
+            print(f"[VT Tax] Found matching row: {matches[0]['text'][:80]}...")
+            # Detail pages are static HTML; a direct GET skips a full
+            # render (and its JS/CSS work) in the browser
+            resp = _HTTP.get(matches[0]['href'], timeout=30)
+            resp.raise_for_status()
+            detail_text = _flatten_html(resp.text)
+        else:
+            # Fallback: try clicking first View Detail link
+            property_links = page.locator('a:has-text("View Detail")')
+            if property_links.count() > 0:
+                print(f"[VT Tax] Found {property_links.count()} View Detail links, clicking first")
+                property_links.first.click()
+                page.wait_for_selector('text=SPAN', timeout=10000)
             else:
-                # Fallback: try clicking first View Detail link
-                property_links = page.locator('a:has-text("View Detail")')
-                if property_links.count() > 0:
-                    print(f"[VT Tax] Found {property_links.count()} View Detail links, clicking first")
-                    property_links.first.click()
-                    time.sleep(2)
-                else:
-                    print("[VT Tax] No View Detail links found")
-                    result['error'] = 'No properties found matching search criteria'
-                    browser.close()
-                    return result
+                print("[VT Tax] No View Detail links found")
+                result['error'] = 'No properties found matching search criteria'
+                page.close()
+                return result
 
+        if detail_text is None:
             # Now we should be on the detail page
-            page.screenshot(path='/tmp/vermont_tax_result.png')
-            print("[VT Tax] Property detail screenshot saved to /tmp/vermont_tax_result.png")
-
+            if debug:
+                page.screenshot(path='/tmp/vermont_tax_result.png')
+                print("[VT Tax] Property detail screenshot saved to /tmp/vermont_tax_result.png")
             detail_text = page.locator('body').inner_text()
-            result = parse_nemrc_property(detail_text, address)
-            result['scraped_at'] = datetime.now().isoformat()
 
-            browser.close()
-            return result
+        result = parse_nemrc_property(detail_text, address)
+        result['scraped_at'] = datetime.now().isoformat()
+        if result.get('success'):
+            _write_cache(cache_path, result)
 
-        except Exception as e:
-            page.screenshot(path='/tmp/vermont_tax_error.png')
-            browser.close()
-            result['error'] = str(e)
-            return result
+        page.close()
+        return result
 
+    except Exception as e:
+        page.screenshot(path='/tmp/vermont_tax_error.png')
+        page.close()
+        result['error'] = str(e)
+        return result
 
-def parse_nemrc_property(text: str, search_address: str) -> dict:
-    """Parse property information from NEMRC detail page."""
 
-    result = {
-        'success': False,
-        'address': search_address,
-        'municipality': 'Dummerston, VT'
-    }
+async def lookup_dummerston_taxes_async(addresses: list, concurrency: int = 8) -> list:
+    """Look up several Dummerston addresses with overlapped network I/O.
 
-    lines = text.split('\n')
-    lines = [l.strip() for l in lines if l.strip()]
+    The plain-HTTP fetches run concurrently (capped by a semaphore);
+    addresses that need the browser fall back one at a time, since the
+    shared Chromium is not safe to drive from multiple threads.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
 
-    # Look for SPAN number
-    span_match = re.search(r'SPAN[:\s]+(\d{3}-\d{3}-\d{5})', text)
-    if span_match:
-        result['span_number'] = span_match.group(1)
+    async def fetch(address):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(_fetch_nemrc_detail, address)
+            except Exception:
+                return None
 
-    # Look for parcel ID
-    parcel_match = re.search(r'Parcel ID[:\s]+([A-Z0-9\-]+)', text, re.IGNORECASE)
-    if parcel_match:
-        result['parcel_id'] = parcel_match.group(1)
+    texts = await asyncio.gather(*(fetch(a) for a in addresses))
 
-    # Look for owner name
-    owner_match = re.search(r'Owner[:\s]+([A-Z][A-Z\s,\.]+)', text)
-    if owner_match:
-        result['owner'] = owner_match.group(1).strip()
+    results = []
+    for address, detail_text in zip(addresses, texts):
+        if detail_text is not None:
+            result = parse_nemrc_property(detail_text, address)
+            result['scraped_at'] = datetime.now().isoformat()
+        else:
+            result = lookup_dummerston_tax(address)
+        results.append(result)
+    return results
 
-    # Look for address
-    addr_match = re.search(r'Location[:\s]+(.+?)(?:\n|$)', text, re.IGNORECASE)
-    if addr_match:
-        result['full_address'] = addr_match.group(1).strip()
 
-    # Look for assessed values
-    land_match = re.search(r'Land[:\s]+\$?([\d,]+)', text)
-    if land_match:
-        result['land_value'] = float(land_match.group(1).replace(',', ''))
+def parse_nemrc_property(text: str, search_address: str) -> dict:
+    """Parse property information from NEMRC detail page."""
 
-    building_match = re.search(r'Building[s]?[:\s]+\$?([\d,]+)', text)
-    if building_match:
-        result['building_value'] = float(building_match.group(1).replace(',', ''))
+    result = {
+        'success': False,
+        'address': search_address,
+        'municipality': 'Dummerston, VT'
+    }
 
-    total_match = re.search(r'Total[:\s]+\$?([\d,]+)', text)
-    if total_match:
-        result['total_assessed_value'] = float(total_match.group(1).replace(',', ''))
+    # One pass over the text; first occurrence wins per field, matching
+    # what the old per-field re.search calls returned
+    for m in _NEMRC_RE.finditer(text):
+        key, transform = _NEMRC_FIELDS[m.lastgroup]
+        if key not in result:
+            result[key] = transform(m.group(m.lastgroup))
 
-    # Look for tax amounts
     # Vermont taxes are typically semi-annual (Aug 15 and Feb 15)
-    tax_match = re.search(r'Tax[:\s]+\$?([\d,]+\.?\d*)', text)
-    if tax_match:
-        result['annual_tax'] = float(tax_match.group(1).replace(',', ''))
+    if 'annual_tax' in result:
         result['installments'] = [
             {'number': 1, 'amount': result['annual_tax'] / 2, 'due_date': '08/15', 'status': 'unknown'},
             {'number': 2, 'amount': result['annual_tax'] / 2, 'due_date': '02/15', 'status': 'unknown'}
@@ -220,9 +527,17 @@ def parse_nemrc_property(text: str, search_address: str) -> dict:
     return result
 
 
-def lookup_brattleboro_tax(parcel: str, address: str = None) -> dict:
+def lookup_brattleboro_tax(parcel: str, address: str = None, debug: bool = False,
+                           use_cache: bool = True) -> dict:
     """Look up Brattleboro VT property tax via AxisGIS."""
 
+    cache_path = _cache_path('brattleboro', parcel or address or '')
+    if use_cache:
+        cached = _read_cache(cache_path)
+        if cached is not None:
+            print(f"[VT Tax] Using cached result from {cache_path}")
+            return cached
+
     result = {
         'success': False,
         'parcel_id': parcel,
@@ -230,99 +545,110 @@ def lookup_brattleboro_tax(parcel: str, address: str = None) -> dict:
         'scraped_at': datetime.now().isoformat()
     }
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        )
-        page = context.new_page()
-
-        try:
-            url = VERMONT_DATABASES['brattleboro']['url']
-            print(f"[VT Tax] Navigating to {url}...")
-            page.goto(url, timeout=60000)
-
-            # Wait for AxisGIS to fully load (it's a heavy JS app)
-            print("[VT Tax] Waiting for AxisGIS to load...")
-            time.sleep(8)
-
-            # AxisGIS has a search icon in the toolbar - click it first
-            print(f"[VT Tax] Looking for search interface...")
-
-            # Try to find and click the search/find button in the toolbar
-            search_btn = page.locator('[title*="Search"], [title*="Find"], .esri-search, button:has-text("Search")').first
-            if search_btn.count() > 0:
-                print("[VT Tax] Found search button, clicking...")
-                search_btn.click()
-                time.sleep(2)
-
-            # Look for search input - AxisGIS uses various input types
-            search_input = page.locator('input.esri-search__input, input[type="search"], input[placeholder*="Find"], input[placeholder*="Search"]').first
-
-            if search_input.count() == 0:
-                # Try broader selector
-                search_input = page.locator('input[type="text"]').first
-
-            if search_input.count() > 0:
-                # Try address first if provided, then parcel
-                search_term = address if address else parcel
-                print(f"[VT Tax] Found search input, searching for: {search_term}")
-                search_input.click()
-                search_input.fill(search_term)
-                time.sleep(2)
-
-                # Look for autocomplete suggestions and click first one
-                suggestions = page.locator('.esri-search__suggestions-list li, .autocomplete-suggestion, [role="option"]')
-                if suggestions.count() > 0:
-                    print(f"[VT Tax] Found {suggestions.count()} suggestions, clicking first...")
-                    suggestions.first.click()
-                    time.sleep(3)
-                else:
-                    # Just press enter
-                    search_input.press('Enter')
-                    time.sleep(5)
+    context = _get_context('brattleboro')
+    page = context.new_page()
+
+    try:
+        url = VERMONT_DATABASES['brattleboro']['url']
+        print(f"[VT Tax] Navigating to {url}...")
+        page.goto(url, timeout=60000)
+
+        # Wait for AxisGIS to fully load (it's a heavy JS app); the
+        # search widget appearing is the real readiness signal
+        print("[VT Tax] Waiting for AxisGIS to load...")
+        page.wait_for_selector(
+            'input.esri-search__input, input[type="search"], input[type="text"]',
+            timeout=20000)
+
+        # AxisGIS has a search icon in the toolbar - click it first
+        print(f"[VT Tax] Looking for search interface...")
+
+        # Try to find and click the search/find button in the toolbar
+        search_btn = page.locator('[title*="Search"], [title*="Find"], .esri-search, button:has-text("Search")').first
+        if search_btn.count() > 0:
+            print("[VT Tax] Found search button, clicking...")
+            search_btn.click()
+            page.wait_for_selector(
+                'input.esri-search__input, input[type="search"], input[type="text"]',
+                state='visible', timeout=10000)
+
+        # Look for search input - AxisGIS uses various input types
+        search_input = page.locator('input.esri-search__input, input[type="search"], input[placeholder*="Find"], input[placeholder*="Search"]').first
+
+        if search_input.count() == 0:
+            # Try broader selector
+            search_input = page.locator('input[type="text"]').first
+
+        if search_input.count() > 0:
+            # Try address first if provided, then parcel
+            search_term = address if address else parcel
+            print(f"[VT Tax] Found search input, searching for: {search_term}")
+            search_input.click()
+            search_input.fill(search_term)
+            try:
+                page.wait_for_selector(
+                    '.esri-search__suggestions-list li, .autocomplete-suggestion, [role="option"]',
+                    timeout=3000)
+            except Exception:
+                pass  # no autocomplete — fall through to Enter
+
+            # Look for autocomplete suggestions and click first one
+            suggestions = page.locator('.esri-search__suggestions-list li, .autocomplete-suggestion, [role="option"]')
+            if suggestions.count() > 0:
+                print(f"[VT Tax] Found {suggestions.count()} suggestions, clicking first...")
+                suggestions.first.click()
             else:
-                print("[VT Tax] Could not find search input")
+                # Just press enter
+                search_input.press('Enter')
+            # The popup panel carries the parcel details; wait for it
+            # rather than a worst-case pause
+            try:
+                page.wait_for_selector(
+                    '.esri-popup, .esri-feature, [role="dialog"]', timeout=10000)
+            except Exception:
+                pass  # no panel — body text check below decides
+        else:
+            print("[VT Tax] Could not find search input")
 
+        if debug:
             page.screenshot(path='/tmp/brattleboro_tax_result.png')
             print("[VT Tax] Screenshot saved to /tmp/brattleboro_tax_result.png")
 
-            # Try to get any property info panel that might have appeared
-            body_text = page.locator('body').inner_text()
-
-            # Check if we found anything related to the parcel
-            parcel_normalized = parcel.replace('-', '')
-            if parcel_normalized in body_text.replace('-', '').replace(' ', ''):
-                result['success'] = True
-                result['note'] = 'Parcel found in AxisGIS - see screenshot for details'
+        # Try to get any property info panel that might have appeared
+        body_text = page.locator('body').inner_text()
 
-                # Try to extract values from popup/panel
-                if 'Kelly' in body_text or 'KELLY' in body_text:
-                    result['address_confirmed'] = True
+        # Check if we found anything related to the parcel
+        parcel_normalized = parcel.replace('-', '')
+        if parcel_normalized in body_text.replace('-', '').replace(' ', ''):
+            result['success'] = True
+            result['note'] = 'Parcel found in AxisGIS - see screenshot for details'
 
-                # Look for assessed value pattern
-                value_match = re.search(r'(?:Total|Assessed|Value)[:\s]*\$?([\d,]+)', body_text)
-                if value_match:
-                    result['total_assessed_value'] = float(value_match.group(1).replace(',', ''))
-            else:
-                result['error'] = 'Could not find parcel in AxisGIS results'
-                result['note'] = 'AxisGIS requires interactive map. Try: https://www.axisgis.com/BrattleboroVT/'
+            # Try to extract values from popup/panel
+            if 'Kelly' in body_text or 'KELLY' in body_text:
+                result['address_confirmed'] = True
 
-            browser.close()
-            return result
+            # Look for assessed value pattern
+            value_match = _VALUE_RE.search(body_text)
+            if value_match:
+                result['total_assessed_value'] = _money(value_match.group(1))
+            _write_cache(cache_path, result)
+        else:
+            result['error'] = 'Could not find parcel in AxisGIS results'
+            result['note'] = 'AxisGIS requires interactive map. Try: https://www.axisgis.com/BrattleboroVT/'
 
-        except Exception as e:
-            page.screenshot(path='/tmp/brattleboro_tax_error.png')
-            browser.close()
-            result['error'] = str(e)
-            return result
+        page.close()
+        return result
 
+    except Exception as e:
+        page.screenshot(path='/tmp/brattleboro_tax_error.png')
+        page.close()
+        result['error'] = str(e)
+        return result
 
-def post_to_callback(url: str, data: dict, town: str) -> bool:
-    """Post results to callback URL."""
-    import urllib.request
 
-    payload = json.dumps({
+def callback_payload(data: dict, town: str = DEFAULT_TOWN) -> dict:
+    """Build the callback payload for one lookup result."""
+    return {
         'provider': 'vermont_nemrc',
         'property_id': None,  # Will be matched by SPAN
         'parcel_number': data.get('span_number'),
@@ -334,25 +660,52 @@ def post_to_callback(url: str, data: dict, town: str) -> bool:
         'success': data.get('success', False),
         'error': data.get('error'),
         'raw_data': {**data, 'town': town}
-    }).encode('utf-8')
+    }
 
-    req = urllib.request.Request(
-        url,
-        data=payload,
-        headers={'Content-Type': 'application/json'}
-    )
+
+def post_to_callback(url: str, data: dict, town: str) -> bool:
+    """Post results to callback URL."""
+    payload = callback_payload(data, town)
+
+    # Compact separators and raw UTF-8 keep the POST body small
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
     try:
-        with urllib.request.urlopen(req) as response:
-            print(f"[VT Tax] Callback response: {response.status}")
-            resp_body = response.read().decode('utf-8')
-            print(f"[VT Tax] Response: {resp_body}")
-            return response.status == 200
+        # The shared session keeps the callback connection alive, so
+        # batch runs pay the TLS handshake once
+        response = _HTTP.post(url, data=body,
+                              headers={'Content-Type': 'application/json'}, timeout=30)
+        print(f"[VT Tax] Callback response: {response.status_code}")
+        print(f"[VT Tax] Response: {response.text}")
+        return response.status_code == 200
     except Exception as e:
         print(f"[VT Tax] Callback failed: {e}")
         return False
 
 
+def post_callbacks(tasks: list, max_workers: int = 16) -> list:
+    """Post several (url, data, town) callbacks concurrently.
+
+    Callback posting is pure I/O, so a thread pool overlaps the waits;
+    the shared session's connection pool is sized to match.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda t: post_to_callback(*t), tasks))
+
+
+def lookup(address: str = DEFAULT_ADDRESS, callback_url: str = None,
+           town: str = DEFAULT_TOWN, parcel: str = None) -> dict:
+    """In-process entry point used by sync_all_taxes.py"""
+    if town == 'brattleboro':
+        result = lookup_brattleboro_tax(parcel or '', address)
+    else:
+        result = lookup_dummerston_tax(address)
+    if callback_url:
+        post_to_callback(callback_url, result, town)
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(description='Vermont Property Tax Lookup')
     parser.add_argument('--town', default=DEFAULT_TOWN, choices=['dummerston', 'brattleboro'],
@@ -361,15 +714,18 @@ def main():
     parser.add_argument('--parcel', help='Parcel ID (for Brattleboro)')
     parser.add_argument('--json', action='store_true', help='Output as JSON only')
     parser.add_argument('--callback', help='URL to POST results to')
+    parser.add_argument('--debug', action='store_true', help='Save screenshots of each step')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the disk cache')
     args = parser.parse_args()
 
     if args.town == 'brattleboro':
         if not args.parcel and not args.address:
             print("Error: Brattleboro requires --parcel or --address argument")
             return {'success': False, 'error': 'Parcel ID or address required for Brattleboro'}
-        result = lookup_brattleboro_tax(args.parcel or '', args.address)
+        result = lookup_brattleboro_tax(args.parcel or '', args.address, debug=args.debug,
+                                        use_cache=not args.no_cache)
     else:
-        result = lookup_dummerston_tax(args.address)
+        result = lookup_dummerston_tax(args.address, debug=args.debug, use_cache=not args.no_cache)
 
     if args.json:
         print(json.dumps(result, indent=2))
@@ -28,8 +28,15 @@ Environment Variables Required:
 import sys
 import os
 import json
+import base64
+import shutil
 import subprocess
+import psycopg2
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from datetime import datetime, timedelta
 from pathlib import Path
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
@@ -45,6 +52,34 @@ LOGIN_TIMEOUT = 60000  # 60 seconds
 NAVIGATION_TIMEOUT = 30000  # 30 seconds
 PROFILE_DIR = Path(__file__).parent / '.playwright-nest-profile'
 
+# We only need cookies and localStorage, so images/fonts/media and the
+# analytics beacons are dead weight on every load
+_BLOCKED_RESOURCES = frozenset({'image', 'font', 'media'})
+_BLOCKED_HOSTS = ('google-analytics', 'googletagmanager', 'doubleclick', 'segment.io')
+
+
+def _block_extras(route):
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCES or any(h in request.url for h in _BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+# Shared session: the two Pushover posts and the Dropcam check reuse one
+# keep-alive connection instead of a TLS handshake each. Transient DNS,
+# connection, and 5xx failures retry with exponential backoff instead of
+# being swallowed as 'assume valid' / dropped notifications.
+_HTTP = requests.Session()
+_HTTP.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Referer': 'https://home.nest.com/',
+})
+_RETRY = Retry(total=5, backoff_factor=1, status_forcelist=[500, 502, 503, 504],
+               allowed_methods=['GET', 'POST'])
+for _scheme in ('http://', 'https://'):
+    _HTTP.mount(_scheme, HTTPAdapter(max_retries=_RETRY))
+
 
 def log(message):
     """Print timestamped log message"""
@@ -64,9 +99,9 @@ def send_pushover_notification(title, message, priority=0):
         log('⚠️  Pushover not configured - skipping notification')
         return
 
-    for user in filter(None, users):
+    def post(user):
         try:
-            requests.post('https://api.pushover.net/1/messages.json', data={
+            _HTTP.post('https://api.pushover.net/1/messages.json', data={
                 'token': token,
                 'user': user,
                 'title': title,
@@ -76,6 +111,12 @@ def send_pushover_notification(title, message, priority=0):
         except Exception as e:
             log(f'⚠️  Failed to send Pushover to {user[:8]}...: {e}')
 
+    # The recipients are independent; overlap the round-trips instead of
+    # paying up to 10s each in sequence
+    recipients = [u for u in users if u]
+    with ThreadPoolExecutor(max_workers=len(recipients)) as pool:
+        list(pool.map(post, recipients))
+
 
 def test_token_validity(token):
     """Test token against Dropcam API (same pattern as update-nest-token-manual.js)"""
@@ -83,14 +124,10 @@ def test_token_validity(token):
 
     try:
         # Use a dummy UUID - 404 means token is valid, 401/403 means invalid
-        response = requests.get(
+        response = _HTTP.get(
             'https://nexusapi-us1.camera.home.nest.com/get_image',
             params={'uuid': 'test-uuid-for-validation', 'width': 640},
-            headers={
-                'Cookie': f'user_token={token}',
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                'Referer': 'https://home.nest.com/'
-            },
+            headers={'Cookie': f'user_token={token}'},
             timeout=10
         )
 
@@ -112,43 +149,27 @@ def test_token_validity(token):
 
 
 def encrypt_token(plaintext):
-    """Encrypt token using Node.js crypto (reuses existing TOKEN_ENCRYPTION_KEY)"""
+    """Encrypt token with AES-256-GCM, matching src/lib/encryption.ts
+
+    Output layout is base64(iv(16) || ciphertext || authTag(16)) — the
+    exact format decryptToken expects — so no Node subprocess is needed.
+    """
     log('Encrypting token...')
 
     encryption_key = os.environ.get('TOKEN_ENCRYPTION_KEY')
     if not encryption_key:
         raise ValueError('TOKEN_ENCRYPTION_KEY not set')
+    if len(encryption_key) != 64:
+        raise ValueError('TOKEN_ENCRYPTION_KEY must be 64 hex characters (32 bytes)')
 
-    # Call Node.js to encrypt (matches src/lib/encryption.ts)
-    node_script = f"""
-    const crypto = require('crypto');
-    const TOKEN_ENCRYPTION_KEY = '{encryption_key}';
-
-    function encryptToken(plaintext) {{
-        const key = Buffer.from(TOKEN_ENCRYPTION_KEY, 'hex');
-        const iv = crypto.randomBytes(16);
-        const cipher = crypto.createCipheriv('aes-256-gcm', key, iv);
-        const encrypted = Buffer.concat([cipher.update(plaintext, 'utf8'), cipher.final()]);
-        const authTag = cipher.getAuthTag();
-        return Buffer.concat([iv, encrypted, authTag]).toString('base64');
-    }}
-
-    console.log(encryptToken(process.argv[1]));
-    """
-
-    try:
-        result = subprocess.run(
-            ['node', '-e', node_script, plaintext],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            check=True
-        )
-        encrypted = result.stdout.strip()
-        log(f'✓ Token encrypted ({len(encrypted)} chars)')
-        return encrypted
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f'Encryption failed: {e.stderr}')
+    key = bytes.fromhex(encryption_key)
+    iv = os.urandom(16)
+    # AESGCM.encrypt returns ciphertext||tag, so prefixing the IV gives
+    # the same bytes Node's createCipheriv + getAuthTag produces
+    ciphertext = AESGCM(key).encrypt(iv, plaintext.encode('utf-8'), None)
+    encrypted = base64.b64encode(iv + ciphertext).decode('ascii')
+    log(f'✓ Token encrypted ({len(encrypted)} chars)')
+    return encrypted
 
 
 def update_database(encrypted_credentials):
@@ -159,51 +180,69 @@ def update_database(encrypted_credentials):
     if not database_url:
         raise ValueError('DATABASE_URL not set')
 
-    # Use docker exec to run psql through the database container
+    # Direct parameterized connection: no psql fork, no f-string SQL
+    try:
+        conn = psycopg2.connect(database_url)
+    except psycopg2.OperationalError as e:
+        # DATABASE_URL may only resolve inside the compose network;
+        # fall back to psql through the db container
+        log(f'⚠️  Direct connection failed ({e}); falling back to docker psql')
+        return _update_database_psql(encrypted_credentials, database_url)
+
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(
+                "UPDATE camera_credentials"
+                " SET credentials_encrypted = %s, updated_at = NOW()"
+                " WHERE provider = 'nest_legacy'"
+                " RETURNING id",
+                (encrypted_credentials,)
+            )
+            row = cur.fetchone()
+    finally:
+        conn.close()
+
+    if row:
+        log('✓ Database updated successfully')
+        return True
+    raise RuntimeError('No nest_legacy credentials found in database')
+
+
+def _update_database_psql(encrypted_credentials, database_url):
+    """Legacy path: update via psql in the db container"""
+    # psql -c has no bind parameters, so quote the literal by hand
+    sql_literal = encrypted_credentials.replace("'", "''")
     update_sql = f"""
     UPDATE camera_credentials
-    SET credentials_encrypted = '{encrypted_credentials}', updated_at = NOW()
+    SET credentials_encrypted = '{sql_literal}', updated_at = NOW()
     WHERE provider = 'nest_legacy'
     RETURNING id;
     """
 
+    # Dispatch on docker availability up front instead of paying a failed
+    # subprocess spawn in production before reaching the real path
+    if shutil.which('docker'):
+        # Development: psql inside the db container, as the postgres user
+        cmd = ['docker', 'exec', 'propertymanagement-db-1', 'psql', '-U', 'postgres', '-d', 'propertymanagement', '-t', '-c', update_sql]
+    else:
+        # Production: direct psql against DATABASE_URL
+        cmd = ['psql', database_url, '-t', '-c', update_sql]
+
     try:
-        # Try docker exec first (development) - try postgres user
         result = subprocess.run(
-            ['docker', 'exec', 'propertymanagement-db-1', 'psql', '-U', 'postgres', '-d', 'propertymanagement', '-t', '-c', update_sql],
+            cmd,
             capture_output=True,
             text=True,
             timeout=10,
             check=True
         )
-
-        if result.stdout.strip():
-            log('✓ Database updated successfully')
-            return True
-        else:
-            raise RuntimeError('No nest_legacy credentials found in database')
-
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f'Database update failed: {e.stderr}')
-    except FileNotFoundError:
-        # If docker command not found, try direct psql (production)
-        try:
-            result = subprocess.run(
-                ['psql', database_url, '-t', '-c', update_sql],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                check=True
-            )
 
-            if result.stdout.strip():
-                log('✓ Database updated successfully')
-                return True
-            else:
-                raise RuntimeError('No nest_legacy credentials found in database')
-
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f'Database update failed: {e.stderr}')
+    if result.stdout.strip():
+        log('✓ Database updated successfully')
+        return True
+    raise RuntimeError('No nest_legacy credentials found in database')
 
 
 def extract_token_from_browser(interactive=False):
@@ -237,175 +276,183 @@ def extract_token_from_browser(interactive=False):
                 '--no-sandbox',
                 '--disable-setuid-sandbox',
                 '--disable-dev-shm-usage',
-                '--disable-web-security'
+                '--disable-web-security',
+                # Skip subsystems this script never uses; shaves browser boot
+                '--disable-gpu',
+                '--disable-extensions',
+                '--disable-background-networking',
+                '--disable-default-apps',
+                '--disable-sync',
+                '--no-first-run',
+                '--disable-features=TranslateUI,MediaRouter,OptimizationHints',
             ],
             viewport={'width': 1280, 'height': 720},
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             ignore_default_args=['--enable-automation'],  # Don't show automation flag
         )
 
+        # Headless runs never look at the page, so skip the decorative
+        # bytes; interactive logins keep the full page for the human
+        if not interactive:
+            context.route('**/*', _block_extras)
+
         try:
-            # Get or create a page
-            if context.pages:
-                page = context.pages[0]
-            else:
-                page = context.new_page()
-
-            # Navigate to home.nest.com
-            log('Navigating to home.nest.com...')
-            page.goto('https://home.nest.com', timeout=NAVIGATION_TIMEOUT, wait_until='load')
-
-            # Wait a moment for potential redirect
-            page.wait_for_timeout(2000)
-
-            # Check if already logged in or needs to authenticate
-            current_url = page.url
-            log(f'Current URL: {current_url}')
-
-            # Handle login
-            if '/login' in current_url or 'accounts.google.com' in current_url:
-                if interactive:
-                    # Interactive mode: Keep browser open and wait
-                    log('⚠️  Browser window is open')
-                    log('    Please log in manually and navigate to see your cameras')
-                    log('    Waiting 15 seconds before starting to check...')
-                    log('    Then will check every 5 seconds (max 5 minutes total)')
-                    log('')
-
-                    # Give user time to see the browser and start logging in
-                    page.wait_for_timeout(15000)  # Wait 15 seconds initially
-
-                    # Wait for successful login by checking URL
-                    start_time = datetime.now()
-                    check_count = 0
-
-                    while True:
-                        check_count += 1
-                        page.wait_for_timeout(5000)  # Wait 5 seconds between checks
-
-                        current_url = page.url
-                        log(f'[Check {check_count}] Current URL: {current_url[:60]}...')
-
-                        # Check if logged in (on home page or camera page)
-                        if 'home.nest.com' in current_url and '/login' not in current_url and '/callback' not in current_url:
-                            log('✓ Login successful! Waiting 5 more seconds for page to fully load...')
-                            page.wait_for_timeout(5000)
-                            break
-
-                        # Timeout after 5 minutes
-                        elapsed = (datetime.now() - start_time).seconds
-                        if elapsed > 300:
-                            raise TimeoutError('Manual login timeout (5 minutes)')
-
-                        remaining = 300 - elapsed
-                        log(f'    Waiting... ({remaining} seconds remaining)')
-                else:
-                    # Automated mode: Try automated login (may fail due to bot detection)
-                    log('⚠️  Login required - automated login may fail due to Google bot detection')
-                    log('   If this fails, run with --setup flag for manual login')
-                    raise RuntimeError('Not logged in. Run with --setup flag to log in manually first.')
-
-            elif 'home.nest.com' in current_url and '/login' not in current_url:
-                log('✓ Already logged in (using saved session)')
-            else:
-                raise RuntimeError(f'Unexpected URL after navigation: {current_url}')
-
-            # Wait for page to fully stabilize and tokens to be set
-            log('Waiting for page to fully load and tokens to be set...')
-            page.wait_for_timeout(10000)  # Wait 10 seconds for everything to settle
-
-            # Extract user_token - try multiple sources
-            log('Extracting user_token...')
-
-            # First, try cookies (check ALL cookies, not just nest.com)
-            cookies = context.cookies()
-            log(f'   Total cookies: {len(cookies)}')
-
-            # Show all cookie names and domains for debugging
-            for c in cookies[:15]:  # Show first 15
-                log(f'     - {c["name"]} (domain: {c.get("domain", "?")})')
-
-            user_token = next((c['value'] for c in cookies if c['name'] == 'user_token'), None)
-            if not user_token:
-                user_token = next((c['value'] for c in cookies if c['name'] == 'cztoken'), None)
-
-            # If not in cookies, try localStorage
-            if not user_token:
-                log('   Token not in cookies, checking localStorage...')
-                try:
-                    local_storage = page.evaluate('() => Object.assign({}, window.localStorage)')
-                    log(f'   LocalStorage keys: {list(local_storage.keys())}')
-
-                    # Check for nestToken.* keys - these contain the actual tokens
-                    nest_token_keys = [k for k in local_storage.keys() if k.startswith('nestToken.')]
-                    if nest_token_keys:
-                        log(f'   Found {len(nest_token_keys)} nestToken keys, checking each...')
-
-                        # Check all nestToken keys to find the one with actual data
-                        for key in nest_token_keys:
-                            token_data = local_storage[key]
-
-                            if not token_data or len(str(token_data)) == 0:
-                                log(f'     {key}: empty')
-                                continue
-
-                            log(f'     {key}: {len(str(token_data))} chars')
-
-                            # The token might be stored as JSON or plain string
-                            if isinstance(token_data, str) and len(token_data) > 100:
-                                if token_data.startswith('g.'):  # Looks like a Google token
-                                    user_token = token_data
-                                    log(f'   ✓ Found Nest Legacy token in {key}!')
-                                    break
-                                else:
-                                    # Try parsing as JSON
-                                    try:
-                                        import json
-                                        parsed = json.loads(token_data)
-                                        # Look for token field in JSON
-                                        potential_token = parsed.get('token') or parsed.get('access_token')
-                                        if potential_token and potential_token.startswith('g.'):
-                                            user_token = potential_token
-                                            log(f'   ✓ Found Nest Legacy token in JSON at {key}!')
-                                            break
-                                    except:
-                                        pass
-
-                    # Fallback: check for common token keys
-                    if not user_token:
-                        for key in ['user_token', 'cztoken', 'access_token', 'token', 'auth_token']:
-                            if key in local_storage:
-                                user_token = local_storage[key]
-                                log(f'   Found token in localStorage["{key}"]')
-                                break
-                except Exception as e:
-                    log(f'   localStorage check failed: {e}')
-
-            # If still not found, try sessionStorage
-            if not user_token:
-                log('   Checking sessionStorage...')
-                try:
-                    session_storage = page.evaluate('() => Object.assign({}, window.sessionStorage)')
-                    log(f'   SessionStorage keys: {list(session_storage.keys())}')
-
-                    for key in ['user_token', 'cztoken', 'access_token', 'token', 'auth_token']:
-                        if key in session_storage:
-                            user_token = session_storage[key]
-                            log(f'   Found token in sessionStorage["{key}"]')
-                            break
-                except Exception as e:
-                    log(f'   sessionStorage check failed: {e}')
-
-            if not user_token:
-                raise RuntimeError('user_token not found in cookies, localStorage, or sessionStorage')
-
-            log(f'✓ Token extracted ({len(user_token)} chars)')
+            user_token = _extract_token(context, interactive)
+
+            # Validate while the browser is still up: a reload-and-retry
+            # costs milliseconds here versus a fresh Chromium launch on
+            # the next cron run
+            if not test_token_validity(user_token):
+                log('⚠️  Token invalid — re-extracting in the live browser...')
+                user_token = _extract_token(context, interactive=False)
+                if not test_token_validity(user_token):
+                    raise RuntimeError('Extracted token is invalid')
+
             return user_token
 
         finally:
             context.close()
 
 
+def _extract_token(context, interactive):
+    """Drive login (if needed) on an open context and pull the token"""
+    # Get or create a page
+    if context.pages:
+        page = context.pages[0]
+    else:
+        page = context.new_page()
+
+    # Navigate to home.nest.com. domcontentloaded is enough: the token
+    # write / login redirect come from the SPA bootstrap, which the
+    # readiness probe below waits for — no need to block on images and
+    # third-party scripts finishing
+    log('Navigating to home.nest.com...')
+    page.goto('https://home.nest.com', timeout=NAVIGATION_TIMEOUT, wait_until='domcontentloaded')
+
+    # The redirect to /login (or the token write on a saved
+    # session) happens via script; wait for whichever lands
+    # instead of a blind pause
+    try:
+        page.wait_for_function(
+            "() => location.pathname.includes('login')"
+            " || Object.keys(localStorage).some(k => k.startsWith('nestToken.'))",
+            timeout=10000)
+    except PlaywrightTimeout:
+        pass
+
+    # Check if already logged in or needs to authenticate
+    current_url = page.url
+    log(f'Current URL: {current_url}')
+
+    # Handle login
+    if '/login' in current_url or 'accounts.google.com' in current_url:
+        if interactive:
+            # Interactive mode: Keep browser open and wait
+            log('⚠️  Browser window is open')
+            log('    Please log in manually and navigate to see your cameras')
+            log('    Waiting up to 5 minutes for login to complete...')
+            log('')
+
+            # Fires the moment the post-login URL lands instead
+            # of polling every 5 seconds
+            try:
+                page.wait_for_url(
+                    lambda url: 'home.nest.com' in url
+                    and '/login' not in url and '/callback' not in url,
+                    timeout=300000)
+            except PlaywrightTimeout:
+                raise TimeoutError('Manual login timeout (5 minutes)')
+            log('✓ Login successful!')
+        else:
+            # Automated mode: Try automated login (may fail due to bot detection)
+            log('⚠️  Login required - automated login may fail due to Google bot detection')
+            log('   If this fails, run with --setup flag for manual login')
+            raise RuntimeError('Not logged in. Run with --setup flag to log in manually first.')
+
+    elif 'home.nest.com' in current_url and '/login' not in current_url:
+        log('✓ Already logged in (using saved session)')
+    else:
+        raise RuntimeError(f'Unexpected URL after navigation: {current_url}')
+
+    # Wait until a token actually lands in localStorage rather
+    # than a worst-case settle pause; the cookie fallback below
+    # still runs if this times out
+    log('Waiting for tokens to be set...')
+    try:
+        page.wait_for_function(
+            "() => Object.keys(localStorage).some("
+            "k => k.startsWith('nestToken.') && (localStorage[k] || '').length > 100)",
+            timeout=30000)
+    except PlaywrightTimeout:
+        log('⚠️  No nestToken key appeared; trying cookies anyway')
+
+    # Extract user_token - try multiple sources
+    log('Extracting user_token...')
+
+    # First, try cookies (check ALL cookies, not just nest.com)
+    cookies = context.cookies()
+    log(f'   Total cookies: {len(cookies)}')
+
+    # Show all cookie names and domains for debugging
+    for c in cookies[:15]:  # Show first 15
+        log(f'     - {c["name"]} (domain: {c.get("domain", "?")})')
+
+    user_token = next((c['value'] for c in cookies if c['name'] == 'user_token'), None)
+    if not user_token:
+        user_token = next((c['value'] for c in cookies if c['name'] == 'cztoken'), None)
+
+    # If not in cookies, have the page find the token itself — one CDP
+    # round-trip returning a single string instead of marshaling every
+    # storage blob across the bridge just to inspect a few keys
+    if not user_token:
+        log('   Token not in cookies, checking localStorage...')
+        try:
+            user_token = page.evaluate("""() => {
+                for (const k of Object.keys(localStorage)) {
+                    if (!k.startsWith('nestToken.')) continue;
+                    const v = localStorage.getItem(k);
+                    if (!v || v.length <= 100) continue;
+                    if (v.startsWith('g.')) return v;
+                    try {
+                        const p = JSON.parse(v);
+                        const t = p.token || p.access_token;
+                        if (t && t.startsWith('g.')) return t;
+                    } catch (e) {}
+                }
+                for (const k of ['user_token', 'cztoken', 'access_token', 'token', 'auth_token']) {
+                    const v = localStorage.getItem(k);
+                    if (v) return v;
+                }
+                return null;
+            }""")
+            if user_token:
+                log('   ✓ Found Nest Legacy token in localStorage')
+        except Exception as e:
+            log(f'   localStorage check failed: {e}')
+
+    # If still not found, try sessionStorage
+    if not user_token:
+        log('   Checking sessionStorage...')
+        try:
+            user_token = page.evaluate("""() => {
+                for (const k of ['user_token', 'cztoken', 'access_token', 'token', 'auth_token']) {
+                    const v = sessionStorage.getItem(k);
+                    if (v) return v;
+                }
+                return null;
+            }""")
+            if user_token:
+                log('   ✓ Found token in sessionStorage')
+        except Exception as e:
+            log(f'   sessionStorage check failed: {e}')
+
+    if not user_token:
+        raise RuntimeError('user_token not found in cookies, localStorage, or sessionStorage')
+
+    log(f'✓ Token extracted ({len(user_token)} chars)')
+    return user_token
+
+
 def main():
     """Main automation flow"""
     try:
@@ -418,14 +465,12 @@ def main():
         else:
             log('Mode: AUTOMATED (using saved session)')
 
-        # Step 1: Extract token from browser
+        # Step 1: Extract a validated token from the browser (validity
+        # is checked while the browser is still open so a bad token can
+        # retry without a relaunch)
         token = extract_token_from_browser(interactive=interactive)
 
-        # Step 2: Test token validity
-        if not test_token_validity(token):
-            raise RuntimeError('Extracted token is invalid')
-
-        # Step 3: Prepare credentials JSON
+        # Step 2: Prepare credentials JSON
         expires_at = (datetime.now() + timedelta(days=30)).isoformat()
         credentials = {
             'access_token': token,
@@ -434,13 +479,13 @@ def main():
         }
         credentials_json = json.dumps(credentials)
 
-        # Step 4: Encrypt credentials
+        # Step 3: Encrypt credentials
         encrypted = encrypt_token(credentials_json)
 
-        # Step 5: Update database
+        # Step 4: Update database
         update_database(encrypted)
 
-        # Step 6: Send success notification
+        # Step 5: Send success notification
         log('✓ Token refresh completed successfully')
         send_pushover_notification(
             '✅ Nest Token Auto-Refreshed',
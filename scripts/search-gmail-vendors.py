@@ -6,85 +6,83 @@ Search Gmail for specific vendor names and A/V-related terms.
 import json
 import base64
 import os
+import re
 import sys
 from pathlib import Path
 
 # We need to use the existing Node.js googleapis setup
 # For now, let's search the raw JSON data more thoroughly
 
-# Load environment variables
-env_path = Path(__file__).parent.parent / ".env.local"
-env_vars = {}
-if env_path.exists():
-    for line in env_path.read_text().splitlines():
-        if "=" in line and not line.startswith("#"):
-            key, value = line.split("=", 1)
-            env_vars[key.strip()] = value.strip()
+# Terms to search for
+SEARCH_TERMS = [
+    # A/V and smart home
+    "smarthaven", "smart haven", "smart-haven",
+    "audio", "video", "a/v", "av ",
+    "sonos", "lutron", "control4", "crestron", "savant",
+    "home theater", "cinema",
+    "automation", "adt", "vivint", "ring",
 
+    # Contractors and services
+    "hvac", "plumb", "electric", "roof",
+    "landscap", "tree", "lawn",
+    "pool", "spa", "pest",
+    "clean", "alarm", "security",
 
-def search_email_analysis():
-    """Search through the email analysis for specific vendors."""
-    analysis_path = Path(__file__).parent.parent / "email-analysis-2025.json"
+    # Vermont specific
+    "vermont", "vt", "brattleboro", "dummerston",
 
-    with open(analysis_path) as f:
-        data = json.load(f)
+    # Rhode Island specific
+    "providence", "rhode island", "ri",
 
-    # Terms to search for
-    search_terms = [
-        # A/V and smart home
-        "smarthaven", "smart haven", "smart-haven",
-        "audio", "video", "a/v", "av ",
-        "sonos", "lutron", "control4", "crestron", "savant",
-        "home theater", "cinema",
-        "automation", "adt", "vivint", "ring",
+    # Brooklyn specific
+    "brooklyn", "williamsburg",
 
-        # Contractors and services
-        "hvac", "plumb", "electric", "roof",
-        "landscap", "tree", "lawn",
-        "pool", "spa", "pest",
-        "clean", "alarm", "security",
+    # Property-related
+    "property", "maintenance", "repair", "install",
+    "contractor", "service",
+]
 
-        # Vermont specific
-        "vermont", "vt", "brattleboro", "dummerston",
+# One alternation over every term: each sender is scanned once by the
+# regex engine instead of once per term in Python. At a shared start
+# position the first listed term wins, so fully overlapping hits (e.g.
+# 'ri' inside 'ring') collapse to one.
+_TERM_RE = re.compile(
+    '|'.join(f'(?P<t{i}>{re.escape(t)})' for i, t in enumerate(SEARCH_TERMS)),
+    re.IGNORECASE)
 
-        # Rhode Island specific
-        "providence", "rhode island", "ri",
 
-        # Brooklyn specific
-        "brooklyn", "williamsburg",
+def search_email_analysis():
+    """Search through the email analysis for specific vendors."""
+    analysis_path = Path(__file__).parent.parent / "email-analysis-2025.json"
 
-        # Property-related
-        "property", "maintenance", "repair", "install",
-        "contractor", "service",
-    ]
+    # One bulk read + parse; skips the TextIOWrapper's incremental
+    # decode that json.load(f) goes through
+    data = json.loads(analysis_path.read_bytes())
 
     all_senders = data.get("topSenders", []) + data.get("unmatchedSenders", [])
 
-    # Remove duplicates
-    seen = set()
-    unique_senders = []
+    # Remove duplicates — one setdefault per sender (a single hashed
+    # lookup) instead of the seen-set's membership test + add + append;
+    # a plain dict comprehension would keep the last duplicate, not the
+    # first record like the original loop
+    unique = {}
     for s in all_senders:
-        if s["email"] not in seen:
-            seen.add(s["email"])
-            unique_senders.append(s)
+        unique.setdefault(s["email"], s)
+    unique_senders = list(unique.values())
 
     print(f"Searching {len(unique_senders)} unique senders...")
     print("=" * 60)
 
     matches = {}
-    for term in search_terms:
-        term_lower = term.lower()
-        for sender in unique_senders:
-            email = sender.get("email", "").lower()
-            name = (sender.get("name") or "").lower()
-
-            if term_lower in email or term_lower in name:
-                if sender["email"] not in matches:
-                    matches[sender["email"]] = {
-                        "sender": sender,
-                        "matched_terms": []
-                    }
-                matches[sender["email"]]["matched_terms"].append(term)
+    for sender in unique_senders:
+        haystack = f'{sender.get("email", "")} {sender.get("name") or ""}'
+        hits = {m.lastgroup for m in _TERM_RE.finditer(haystack)}
+        if hits:
+            matches[sender["email"]] = {
+                "sender": sender,
+                "matched_terms": [SEARCH_TERMS[i]
+                                  for i in sorted(int(g[1:]) for g in hits)]
+            }
 
     # Group by category
     categories = {
@@ -99,11 +97,19 @@ def search_email_analysis():
         "Local (Brooklyn)": ["brooklyn", "williamsburg"],
     }
 
+    # Bucket each match once via a term -> categories reverse index
+    # instead of rescanning every match per category
+    term_to_cats = {}
     for category, terms in categories.items():
-        category_matches = [
-            m for email, m in matches.items()
-            if any(t in m["matched_terms"] for t in terms)
-        ]
+        for t in terms:
+            term_to_cats.setdefault(t, []).append(category)
+
+    buckets = {category: [] for category in categories}
+    for m in matches.values():
+        for cat in dict.fromkeys(c for t in m["matched_terms"] for c in term_to_cats.get(t, ())):
+            buckets[cat].append(m)
+
+    for category, category_matches in buckets.items():
         if category_matches:
             print(f"\n{category}:")
             for m in sorted(category_matches, key=lambda x: -x["sender"]["count"]):
@@ -126,6 +132,10 @@ def search_email_analysis():
         "uber", "lyft", "doordash",
         "nextdoor", "reddit", "pinterest",
     ]
+    noreply_needles = ["noreply", "no-reply", "donotreply", "newsletter", "marketing", "promo", "news@", "info@lists"]
+    # One alternation over all the blocklist needles — a single linear scan
+    # per address instead of ~30 Python-level substring checks
+    skip_re = re.compile("|".join(map(re.escape, corporate_domains + noreply_needles)))
 
     local_vendors = []
     for sender in unique_senders:
@@ -136,13 +146,8 @@ def search_email_analysis():
         if count < 2 or count > 200:
             continue
 
-        # Skip corporate domains
-        is_corporate = any(corp in email for corp in corporate_domains)
-        if is_corporate:
-            continue
-
-        # Skip obvious marketing/noreply
-        if any(x in email for x in ["noreply", "no-reply", "donotreply", "newsletter", "marketing", "promo", "news@", "info@lists"]):
+        # Skip corporate domains and obvious marketing/noreply addresses
+        if skip_re.search(email):
             continue
 
         local_vendors.append(sender)
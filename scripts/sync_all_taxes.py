@@ -6,55 +6,34 @@ Runs all property tax lookups and posts results to the web app.
 
 Usage:
     python3 scripts/sync_all_taxes.py
-    python3 scripts/sync_all_taxes.py --callback http://localhost:3000/api/taxes/sync/callback
+    python3 scripts/sync_all_taxes.py --callback http://localhost:3000/api/taxes/sync/callback-batch
     python3 scripts/sync_all_taxes.py --dry-run
 
 This script is meant to be run weekly via cron or manually.
 Add to crontab:
-    0 6 * * 1 cd /path/to/propertymanagement && python3 scripts/sync_all_taxes.py --callback https://yourapp.vercel.app/api/taxes/sync/callback
+    0 6 * * 1 cd /path/to/propertymanagement && python3 scripts/sync_all_taxes.py --callback https://yourapp.vercel.app/api/taxes/sync/callback-batch
 """
-import sys
+import hashlib
+import importlib.util
 import json
-import subprocess
+import multiprocessing
+import os
+import signal
+import time
 import argparse
-from datetime import datetime
-
-sys.path.insert(0, '/Users/toddhome/Library/Python/3.12/lib/python/site-packages')
-
-# Property configurations for each scraper
-PROPERTIES = {
-    'santa_clara_county': [
-        {
-            'name': '125 Dana Avenue, San Jose',
-            'script': 'scripts/lookup_scc_tax.py',
-            'args': []
-        }
-    ],
-    'city_hall_systems': [
-        {
-            'name': '88 Williams St, Providence',
-            'script': 'scripts/lookup_providence_tax.py',
-            'args': ['--address', '88 Williams']
-        }
-    ],
-    'vermont_nemrc': [
-        {
-            'name': '2055 Sunset Lake Rd, Dummerston (Main House)',
-            'script': 'scripts/lookup_vermont_tax.py',
-            'args': ['--address', '2055 Sunset Lake']
-        },
-        {
-            'name': '1910 Sunset Lake Rd, Dummerston (Booth House)',
-            'script': 'scripts/lookup_vermont_tax.py',
-            'args': ['--address', '1910 Sunset Lake']
-        },
-        {
-            'name': '2001 Sunset Lake Rd, Dummerston (Guest House)',
-            'script': 'scripts/lookup_vermont_tax.py',
-            'args': ['--address', '2001 Sunset Lake']
-        }
-    ]
-}
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+# Property configurations live in config/tax_properties.json so adding a
+# property doesn't mean editing code; the hash lets the callback spot
+# unchanged-config syncs
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'tax_properties.json'
+_CONFIG_BYTES = CONFIG_PATH.read_bytes()
+PROPERTIES = json.loads(_CONFIG_BYTES)
+CONFIG_HASH = hashlib.sha256(_CONFIG_BYTES).hexdigest()[:8]
 
 # NYC properties are synced via the web app's API (no Playwright needed)
 NYC_NOTE = """
@@ -63,51 +42,89 @@ Run: curl -X POST https://yourapp.vercel.app/api/cron/sync-taxes
 """
 
 
-def run_scraper(script: str, args: list, callback_url: str = None, dry_run: bool = False) -> dict:
-    """Run a single tax scraper script."""
-    cmd = ['python3', script] + args + ['--json']
+SCRAPER_TIMEOUT = 120  # 2 minute timeout per scraper
+
+# Worker count caps concurrent Chromium instances. Tasks are grouped by
+# script, so each lookup module's lazy per-process browser — and its
+# persistent profile directory — stays inside a single worker and is
+# reused across that script's properties.
+POOL_WORKERS = 3
 
-    if callback_url:
-        cmd.extend(['--callback', callback_url])
+# Municipal tax data changes quarterly at most, so a weekly cron can
+# reuse last week's result instead of re-scraping every property
+CACHE_PATH = Path.home() / '.cache' / 'propertymanagement' / 'tax_sync.json'
+CACHE_TTL_DAYS = 7
 
-    if dry_run:
-        print(f"  [DRY RUN] Would run: {' '.join(cmd)}")
-        return {'success': True, 'dry_run': True}
+# Flush partial callback batches every few results (or seconds) so most
+# data is persisted server-side even if a late scraper wedges
+CALLBACK_FLUSH_COUNT = 3
+CALLBACK_FLUSH_SECONDS = 15
 
+
+def _load_cache() -> dict:
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout per scraper
-        )
-
-        # Try to parse JSON from output
-        try:
-            # Find the JSON in the output (may have log lines before it)
-            output_lines = result.stdout.strip().split('\n')
-            json_start = None
-            for i, line in enumerate(output_lines):
-                if line.strip().startswith('{'):
-                    json_start = i
-                    break
-
-            if json_start is not None:
-                json_str = '\n'.join(output_lines[json_start:])
-                return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
-
-        return {
-            'success': result.returncode == 0,
-            'stdout': result.stdout,
-            'stderr': result.stderr
-        }
-
-    except subprocess.TimeoutExpired:
-        return {'success': False, 'error': 'Script timed out after 120 seconds'}
+        return json.loads(CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: dict):
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Write-to-temp + rename so a crash can't leave a torn cache file
+    tmp = CACHE_PATH.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps(cache))
+    os.replace(tmp, CACHE_PATH)
+
+
+def _cache_fresh(entry: dict, ttl: timedelta) -> bool:
+    try:
+        return datetime.now() - datetime.fromisoformat(entry['fetched_at']) < ttl
+    except (KeyError, TypeError, ValueError):
+        return False
+
+# Lookup modules loaded once per process, keyed by script path, so
+# repeat lookups (e.g. the three Vermont houses) skip the import cost
+_MODULES = {}
+
+
+def _load_module(script: str):
+    """Import a lookup script as a module, caching per process."""
+    module = _MODULES.get(script)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(Path(script).stem, script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _MODULES[script] = module
+    return module
+
+
+def _on_alarm(signum, frame):
+    raise TimeoutError(f'Lookup timed out after {SCRAPER_TIMEOUT} seconds')
+
+
+def run_scraper(script: str, kwargs: dict) -> dict:
+    """Run a single tax lookup in-process."""
+    # SIGALRM keeps the old per-scraper ceiling for a wedged browser
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.alarm(SCRAPER_TIMEOUT)
+    try:
+        return _load_module(script).lookup(**kwargs)
     except Exception as e:
         return {'success': False, 'error': str(e)}
+    finally:
+        signal.alarm(0)
+
+
+def _run_scraper_group(group):
+    """Pool worker: run one script's properties sequentially.
+
+    Module-level (not a closure) so multiprocessing can pickle it. All of
+    a script's properties run in the same worker so two processes never
+    launch Chromium on the same persistent profile at once — the second
+    launch would fail on the profile's SingletonLock.
+    """
+    return [(provider, prop, run_scraper(prop['script'], prop['kwargs']))
+            for provider, prop in group]
 
 
 def main():
@@ -115,70 +132,169 @@ def main():
     parser.add_argument('--callback', help='Callback URL for posting results')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be run without executing')
     parser.add_argument('--provider', help='Only run specific provider (santa_clara_county, city_hall_systems, vermont_nemrc)')
+    parser.add_argument('--force', action='store_true', help='Re-scrape even if the cached result is fresh')
+    parser.add_argument('--ttl-days', type=float, default=CACHE_TTL_DAYS, help='Cache lifetime in days')
     args = parser.parse_args()
 
+    started = datetime.now()
+
     print("=" * 70)
-    print("PROPERTY TAX SYNC - " + datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    print("PROPERTY TAX SYNC - " + started.strftime('%Y-%m-%d %H:%M:%S'))
     print("=" * 70)
 
     if args.callback:
         print(f"Callback URL: {args.callback}")
-    if args.dry_run:
-        print("DRY RUN MODE - No scripts will be executed")
 
     print()
 
+    selected = [
+        (provider, prop)
+        for provider, properties in PROPERTIES.items()
+        if not args.provider or provider == args.provider
+        for prop in properties
+    ]
+
+    # Dry runs just list what would be scraped — no cache, no pool,
+    # no per-property result plumbing
+    if args.dry_run:
+        print("DRY RUN MODE - No scrapers will be executed\n")
+        rows = [(str(i), provider, prop['name'], prop['script'])
+                for i, (provider, prop) in enumerate(selected, 1)]
+        headers = ('#', 'Provider', 'Name', 'Script')
+        widths = [max(len(row[col]) for row in [headers] + rows) for col in range(len(headers))]
+        for row in [headers] + rows:
+            print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)))
+        return {'dry_run': True, 'total': len(rows)}
+
     results = {
-        'started_at': datetime.now().isoformat(),
+        'started_at': started.isoformat(),
         'callback_url': args.callback,
+        'config_hash': CONFIG_HASH,
         'properties': []
     }
 
-    total = 0
+    # Serve fresh cached results directly; only stale (or forced)
+    # properties go to the scrapers
+    cache = _load_cache()
+    cache_dirty = False
+    ttl = timedelta(days=args.ttl_days)
+
+    cached = []
+    tasks = []
+    for provider, prop in selected:
+        entry = cache.get(f"{provider}:{prop['name']}")
+        if not args.force and entry and _cache_fresh(entry, ttl):
+            cached.append((provider, prop, entry['data']))
+        else:
+            tasks.append((provider, prop))
+
+    total = len(selected)
     successful = 0
-
-    for provider, properties in PROPERTIES.items():
-        if args.provider and provider != args.provider:
-            continue
-
-        print(f"\n--- {provider.upper().replace('_', ' ')} ---")
-
-        for prop in properties:
-            total += 1
-            print(f"\n[{total}] {prop['name']}")
-
-            result = run_scraper(
-                prop['script'],
-                prop['args'],
-                args.callback,
-                args.dry_run
-            )
-
-            success = result.get('success', False)
-            if success:
-                successful += 1
-                print(f"    ✓ Success")
-                if result.get('annual_tax'):
-                    print(f"    Annual Tax: ${result.get('annual_tax'):,.2f}")
-                elif result.get('total_assessed_value'):
-                    print(f"    Assessed Value: ${result.get('total_assessed_value'):,.2f}")
-            else:
-                print(f"    ✗ Failed: {result.get('error', 'Unknown error')}")
-
-            results['properties'].append({
-                'name': prop['name'],
-                'provider': provider,
-                'success': success,
+    done = 0
+    callback_batch = []
+    last_flush = time.monotonic()
+    poster = ThreadPoolExecutor(max_workers=1) if args.callback else None
+
+    def post_batch(batch):
+        body = json.dumps({'results': batch, 'config_hash': CONFIG_HASH},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        try:
+            response = requests.post(args.callback, data=body,
+                                     headers={'Content-Type': 'application/json'}, timeout=30)
+            print(f"Callback response ({len(batch)} results): {response.status_code}")
+        except Exception as e:
+            print(f"Callback failed: {e}")
+
+    def flush_callbacks(force=False):
+        nonlocal callback_batch, last_flush
+        if not poster or not callback_batch:
+            return
+        if not (force or len(callback_batch) >= CALLBACK_FLUSH_COUNT
+                or time.monotonic() - last_flush > CALLBACK_FLUSH_SECONDS):
+            return
+        # Post off-thread so a slow callback never stalls the consumer loop
+        poster.submit(post_batch, callback_batch)
+        callback_batch = []
+        last_flush = time.monotonic()
+
+    def consume(outcome, from_cache=False):
+        nonlocal successful, done, cache_dirty
+        provider, prop, result = outcome
+        done += 1
+        suffix = ' (cached)' if from_cache else ''
+        print(f"\n[{done}/{total}] {provider.upper().replace('_', ' ')} — {prop['name']}{suffix}")
+
+        success = result.get('success', False)
+        if success:
+            successful += 1
+            print(f"    ✓ Success")
+            if result.get('annual_tax'):
+                print(f"    Annual Tax: ${result.get('annual_tax'):,.2f}")
+            elif result.get('total_assessed_value'):
+                print(f"    Assessed Value: ${result.get('total_assessed_value'):,.2f}")
+        else:
+            print(f"    ✗ Failed: {result.get('error', 'Unknown error')}")
+
+        results['properties'].append({
+            'name': prop['name'],
+            'provider': provider,
+            'success': success,
+            'data': result
+        })
+
+        if from_cache:
+            return
+
+        if success:
+            cache[f"{provider}:{prop['name']}"] = {
+                'fetched_at': datetime.now().isoformat(),
                 'data': result
-            })
+            }
+            cache_dirty = True
+
+        if args.callback:
+            callback_batch.append(_load_module(prop['script']).callback_payload(result))
+            flush_callbacks()
+
+    # Each script's lookups are independent of the other scripts', so the
+    # groups run concurrently; imap_unordered streams each group back as
+    # it finishes, bounding wall time by the slowest script instead of
+    # the sum. Within a group lookups run sequentially on one browser.
+    for outcome in cached:
+        consume(outcome, from_cache=True)
+
+    by_script = {}
+    for provider, prop in tasks:
+        by_script.setdefault(prop['script'], []).append((provider, prop))
+    groups = list(by_script.values())
+
+    if len(groups) <= 1:
+        for group in groups:
+            for outcome in _run_scraper_group(group):
+                consume(outcome)
+    else:
+        with multiprocessing.Pool(min(POOL_WORKERS, len(groups))) as pool:
+            for outcomes in pool.imap_unordered(_run_scraper_group, groups):
+                for outcome in outcomes:
+                    consume(outcome)
+
+    if cache_dirty:
+        _save_cache(cache)
 
     print("\n" + "=" * 70)
     print(f"SUMMARY: {successful}/{total} successful")
     print("=" * 70)
 
+    # Drain whatever is still pending and wait for in-flight posts
+    flush_callbacks(force=True)
+    if poster:
+        poster.shutdown(wait=True)
+
     print(NYC_NOTE)
 
-    results['completed_at'] = datetime.now().isoformat()
+    completed = datetime.now()
+    results['completed_at'] = completed.isoformat()
+    results['duration_seconds'] = (completed - started).total_seconds()
     results['total'] = total
     results['successful'] = successful
 
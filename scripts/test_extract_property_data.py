@@ -0,0 +1,34 @@
+"""Tests for the insurance extraction regex in extract_property_data.py"""
+import importlib.util
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    "extract_property_data", Path(__file__).with_name("extract_property_data.py"))
+extract_property_data = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(extract_property_data)
+
+
+def test_policy_period_ends_yields_expiration_date():
+    info = extract_property_data.extract_insurance_info(
+        "Policy period ends: 06/01/2025", "policy.pdf")
+    assert info["expiration_dates"] == ["06/01/2025"]
+    assert info["policy_numbers"] == []
+
+
+def test_policy_expires_yields_expiration_date():
+    info = extract_property_data.extract_insurance_info(
+        "policy expires 12/31/2024", "policy.pdf")
+    assert info["expiration_dates"] == ["12/31/2024"]
+    assert info["policy_numbers"] == []
+
+
+def test_policy_number_still_captured():
+    info = extract_property_data.extract_insurance_info(
+        "Policy Number: HO-1234567", "policy.pdf")
+    assert info["policy_numbers"] == ["HO-1234567"]
+
+
+def test_policy_period_range_captures_both_dates():
+    info = extract_property_data.extract_insurance_info(
+        "06/01/2024 to 06/01/2025", "policy.pdf")
+    assert info["expiration_dates"] == ["06/01/2024", "06/01/2025"]
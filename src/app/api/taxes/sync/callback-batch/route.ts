@@ -0,0 +1,63 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { processTaxCallback, TaxCallbackPayload } from '@/lib/taxes/process-callback'
+
+export const dynamic = 'force-dynamic'
+
+/**
+ * Batched callback endpoint for external Playwright tax scrapers
+ *
+ * scripts/sync_all_taxes.py collects every scraper result from a run and
+ * posts them here in one request, so a weekly sync costs a single
+ * round-trip (and serverless invocation) instead of one per property.
+ *
+ * Body: { results: TaxCallbackPayload[], config_hash?: string }
+ *
+ * config_hash identifies the config/tax_properties.json revision the run
+ * used; it is logged and echoed so unchanged-config syncs can be spotted.
+ */
+export async function POST(request: NextRequest) {
+  try {
+    const payload = await request.json()
+    const results: TaxCallbackPayload[] = payload?.results
+    const configHash: string | undefined = payload?.config_hash
+
+    if (!Array.isArray(results)) {
+      return NextResponse.json({ error: 'Missing results array' }, { status: 400 })
+    }
+
+    const outcomes = []
+    for (const entry of results) {
+      try {
+        const outcome = await processTaxCallback(entry)
+        outcomes.push({
+          provider: entry?.provider,
+          parcel_number: entry?.parcel_number,
+          status: outcome.status,
+          ...outcome.body
+        })
+      } catch (error) {
+        outcomes.push({
+          provider: entry?.provider,
+          parcel_number: entry?.parcel_number,
+          status: 500,
+          error: error instanceof Error ? error.message : 'Unknown error'
+        })
+      }
+    }
+
+    console.log(`[Tax Callback Batch] Processed ${outcomes.length} results (config ${configHash || 'unknown'})`)
+
+    return NextResponse.json({
+      success: true,
+      processed: outcomes.length,
+      config_hash: configHash,
+      results: outcomes
+    })
+  } catch (error) {
+    console.error('[Tax Callback Batch] Error:', error)
+    return NextResponse.json({
+      error: 'Failed to process batch callback',
+      details: error instanceof Error ? error.message : 'Unknown error'
+    }, { status: 500 })
+  }
+}
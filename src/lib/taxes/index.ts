@@ -17,6 +17,7 @@
 
 export * from './types'
 export * from './sync'
+export * from './process-callback'
 export * from './sync-to-payments'
 export * from './providers/nyc-open-data'
 export * from './providers/santa-clara-county'